@@ -1,5 +1,10 @@
+import time
 from aqt.qt import *
-from .theme import THEME, VERSION
+from aqt.utils import showInfo
+from .theme import THEME
+from .version import VERSION
+from .profiling import profiler
+from .session import user_file
 from .widgets import RoundedWidget, RoundedButton
 
 
@@ -8,7 +13,7 @@ class AboutDialog(QDialog):
         super().__init__(parent)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Dialog)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setFixedSize(420, 540)
+        self.setFixedSize(420, 596 if profiler.enabled else 540)
         self.setup_ui()
         self._drag_pos = None
 
@@ -202,6 +207,33 @@ class AboutDialog(QDialog):
         changelog_container.addStretch()
         layout.addLayout(changelog_container)
 
+        if profiler.enabled:
+            layout.addSpacing(12)
+
+            report_btn = RoundedButton(
+                text="Performance Report",
+                radius=20,
+                bg_color="transparent",
+                hover_color=THEME['glass_hover'],
+                text_color=THEME['text_muted'],
+                border_color=THEME['glass_border'],
+                border_width=1,
+                parent=self
+            )
+            report_btn.setFixedHeight(44)
+            report_btn.setFixedWidth(200)
+            report_font = QFont("Inter")
+            report_font.setPixelSize(14)
+            report_font.setWeight(QFont.Weight.DemiBold)
+            report_btn.setFont(report_font)
+            report_btn.clicked.connect(self.dump_report)
+
+            report_container = QHBoxLayout()
+            report_container.addStretch()
+            report_container.addWidget(report_btn)
+            report_container.addStretch()
+            layout.addLayout(report_container)
+
         layout.addStretch()
 
     def show_changelog(self):
@@ -209,6 +241,15 @@ class AboutDialog(QDialog):
         dialog = ChangelogDialog(self)
         dialog.exec()
 
+    def dump_report(self):
+        path = user_file(f"performance-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+        try:
+            profiler.dump(path)
+        except OSError as e:
+            showInfo(f"Could not write performance report: {str(e)}")
+            return
+        showInfo(f"Performance report saved to:\n{path}")
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self._drag_pos = event.globalPosition().toPoint()
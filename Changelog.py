@@ -1,5 +1,6 @@
 from aqt.qt import *
-from .theme import THEME, VERSION
+from .theme import THEME
+from .version import VERSION
 from .widgets import RoundedWidget, RoundedButton
 
 class ChangelogDialog(QDialog):
@@ -1,15 +1,10 @@
-import os
 from aqt import mw, gui_hooks
 from aqt.qt import *
 from aqt.overview import Overview
 
-_fonts_dir = os.path.join(os.path.dirname(__file__), "fonts")
-if os.path.isdir(_fonts_dir):
-    for _font_file in os.listdir(_fonts_dir):
-        if _font_file.endswith((".ttf", ".otf")):
-            QFontDatabase.addApplicationFont(os.path.join(_fonts_dir, _font_file))
-
 from .addon import AnkiCramAddon
+from .fonts import load_fonts_in_background
+from .profiling import profiler
 
 addon = AnkiCramAddon(__name__)
 mw.ankicram_addon = addon
@@ -19,13 +14,16 @@ def add_menu_item():
     action.triggered.connect(addon.show_dialog)
     mw.form.menuTools.addAction(action)
 
+@profiler.timed("on_webview_will_set_content")
 def on_webview_will_set_content(web_content, context):
     if not isinstance(context, Overview):
         return
-    
+
+    cram_deck_ids = addon.current_cram_deck_ids()
+    if not cram_deck_ids:
+        return
     try:
-        current_deck_name = mw.col.decks.get_current()['name']
-        if not current_deck_name.startswith("AnkiCram - "):
+        if mw.col.get_config("curDeck", None) not in cram_deck_ids:
             return
     except Exception:
         return
@@ -33,6 +31,13 @@ def on_webview_will_set_content(web_content, context):
     css = "button#options, button#rebuild, button#empty { display: none !important; }"
     web_content.head += f"<style>{css}</style>"
 
+mw.addonManager.setConfigUpdatedAction(__name__, addon.on_config_updated)
+
 gui_hooks.reviewer_did_answer_card.append(addon.on_answer_card)
 gui_hooks.profile_did_open.append(add_menu_item)
+gui_hooks.profile_did_open.append(load_fonts_in_background)
+gui_hooks.profile_did_open.append(addon.on_profile_did_open)
+gui_hooks.profile_will_close.append(addon.on_profile_will_close)
+gui_hooks.collection_did_load.append(addon.on_collection_did_load)
+gui_hooks.operation_did_execute.append(addon.on_operation_did_execute)
 gui_hooks.webview_will_set_content.append(on_webview_will_set_content)
@@ -1,9 +1,21 @@
+import time
 from aqt import mw
 from aqt.qt import *
-from .widgets import CramCornerWidget
-from .dialog import AnkiCramDialog
-from .Changelog import ChangelogDialog
-from .theme import VERSION
+from aqt.operations import QueryOp
+from aqt.utils import tooltip
+from .deck_index import DeckIndex
+from .session import SESSION_FIELDS, SessionRegistry, remove_file, user_file
+from .journal import CardJournal
+from .engine import CRAM_PREFIX, end_cram_deck, park_cards, release_cards
+from .requeue import RequeueScheduler
+from .tasks import apply_op_changes
+from .eventlog import AnswerLog
+from .history import SessionHistory
+from .profiling import profiler
+from .fonts import ensure_fonts
+from .version import VERSION
+
+PARK_SECONDS = 86400
 
 
 class AnkiCramAddon:
@@ -11,35 +23,260 @@ class AnkiCramAddon:
         self.manager_name = manager_name
         self.current_cram_did = None
         self.current_cram_name = None
-        self.original_deck_id = None
+        self.original_deck_ids = []
         self.session_start_time = None
         self.session_cards_reviewed = 0
         self.session_cards_failed = 0
         self.session_reloops = 0
+        self.session_cards_moved = 0
         self.infinite_loop_enabled = True
         self.persistent_deck_mode = False
         self.base_search = ""
+        self.tag_filter_text = ""
         self.failed_cards = set()
         self.corner_widget = None
+        self.dialog = None
+        self.deck_index = DeckIndex()
+        self.cram_deck_ids = set()
+        self.cram_deck_ids_stale = False
+        self.sessions = SessionRegistry(user_file("sessions.json"))
+        self.history = SessionHistory(user_file("history.db"))
+        self.journal = None
+        self.requeue = RequeueScheduler()
+        self.answer_log = AnswerLog()
+        self.stats_listeners = []
+        profiler.configure(self.get_config())
+
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(2000)
+        self._save_timer.timeout.connect(self.save_session)
 
         QTimer.singleShot(1000, self.check_for_update)
 
     def is_active_session(self):
         return self.current_cram_did is not None
 
+    def clear_session(self):
+        self.current_cram_did = None
+        self.current_cram_name = None
+        self.session_start_time = None
+        self.session_cards_reviewed = 0
+        self.session_cards_failed = 0
+        self.session_reloops = 0
+        self.session_cards_moved = 0
+        self.tag_filter_text = ""
+        self.failed_cards = set()
+        self.requeue.clear()
+        self.answer_log.clear()
+
+    def add_stats_listener(self, listener):
+        if listener not in self.stats_listeners:
+            self.stats_listeners.append(listener)
+
+    def remove_stats_listener(self, listener):
+        if listener in self.stats_listeners:
+            self.stats_listeners.remove(listener)
+
+    def notify_stats_changed(self):
+        for listener in list(self.stats_listeners):
+            listener()
+
+    def get_config(self):
+        if not self.manager_name:
+            return {}
+        return mw.addonManager.getConfig(self.manager_name) or {}
+
+    def on_config_updated(self, config):
+        profiler.configure(config or {})
+
+    def start_requeue(self):
+        self.requeue.clear()
+        self.requeue.offset = max(0, int(self.get_config().get("failed_card_offset", 3)))
+
+    def _profile_name(self):
+        return mw.pm.name if mw.pm else None
+
+    def _answer_log_path(self, profile):
+        return user_file(f"answers-{profile}.bin")
+
+    def answer_export_path(self, history_id):
+        return user_file(f"session-{history_id}-answers.csv")
+
+    def save_session(self):
+        self._save_timer.stop()
+        profile = self._profile_name()
+        if not profile:
+            return
+        try:
+            if self.is_active_session():
+                session = {field: getattr(self, field) for field in SESSION_FIELDS}
+                session["failed_cards"] = sorted(self.failed_cards)
+                self.sessions.put(profile, session)
+                self.answer_log.save(self._answer_log_path(profile))
+            else:
+                self.sessions.remove(profile)
+                remove_file(self._answer_log_path(profile))
+        except OSError:
+            pass
+
+    def record_history(self):
+        profile = self._profile_name()
+        if not profile or not self.is_active_session() or not self.session_start_time:
+            return
+        try:
+            history_id = self.history.record(
+                profile,
+                self.original_deck_ids[0] if len(self.original_deck_ids) == 1 else 0,
+                self.current_cram_name.replace(CRAM_PREFIX, "", 1),
+                self.session_start_time,
+                time.time(),
+                self.session_cards_reviewed,
+                self.session_cards_failed,
+                self.session_reloops,
+                self.session_cards_moved,
+            )
+            if len(self.answer_log):
+                self.answer_log.export_csv(self.answer_export_path(history_id))
+        except Exception:
+            pass
+
+    def history_page(self, limit, before=None):
+        profile = self._profile_name()
+        if not profile:
+            return []
+        return self.history.page(profile, limit, before)
+
+    def restore_session(self):
+        self.clear_session()
+        profile = self._profile_name()
+        session = self.sessions.get(profile) if profile else None
+        if not session:
+            return
+
+        cram_did = session.get("current_cram_did")
+        if not cram_did or self.deck_index.name(cram_did) != session.get("current_cram_name"):
+            self.save_session()
+            return
+
+        for field in SESSION_FIELDS:
+            if field in session:
+                setattr(self, field, session[field])
+        if not self.original_deck_ids and session.get("original_deck_id"):
+            self.original_deck_ids = [session["original_deck_id"]]
+        self.failed_cards = set(session.get("failed_cards", ()))
+        self.answer_log.load(self._answer_log_path(profile))
+        self.start_requeue()
+        if self.failed_cards:
+            journal = self.journal if self.journal is not None and self.journal.cram_did == self.current_cram_did else None
+            try:
+                release_cards(mw.col, list(self.failed_cards), self.current_cram_did, journal)
+            except Exception:
+                pass
+        self.show_corner_widget()
+
+    def repair_orphaned_cards(self):
+        journal = self.journal
+        if journal is None or not journal.cram_did:
+            return
+        if self.is_active_session() and journal.cram_did == self.current_cram_did:
+            return
+
+        cram_did = journal.cram_did
+        if cram_did not in self.deck_index:
+            journal.delete()
+            return
+
+        def on_success(ret):
+            _, changes = ret
+            self.deck_index.invalidate()
+            journal.delete()
+            apply_op_changes(changes)
+            tooltip("✅ Restored cards from an interrupted AnkiCram session", period=3000)
+
+        def on_failure(error):
+            self.deck_index.invalidate()
+            tooltip(f"⚠️ Could not restore orphaned AnkiCram cards: {str(error)}", period=3000)
+
+        op = QueryOp(parent=mw, op=lambda col: end_cram_deck(col, cram_did, journal=journal), success=on_success)
+        op.failure(on_failure).with_progress("Restoring AnkiCram cards...").run_in_background()
+
+    def refresh_cram_deck_ids(self):
+        self.cram_deck_ids_stale = False
+        try:
+            self.cram_deck_ids = set(self.deck_index.cram_deck_ids())
+        except Exception:
+            self.cram_deck_ids = set()
+
+    def current_cram_deck_ids(self):
+        if self.cram_deck_ids_stale:
+            self.refresh_cram_deck_ids()
+        return self.cram_deck_ids
+
+    def on_profile_did_open(self):
+        self.deck_index.invalidate()
+        self.refresh_cram_deck_ids()
+        profile = self._profile_name()
+        self.journal = CardJournal(user_file(f"journal-{profile}.bin")) if profile else None
+        if self.journal is not None:
+            self.journal.load()
+        self.restore_session()
+        self.repair_orphaned_cards()
+
+    def on_profile_will_close(self):
+        self.save_session()
+        self.clear_session()
+        self.hide_corner_widget()
+        self.close_dialog()
+        self.cram_deck_ids = set()
+        self.cram_deck_ids_stale = False
+        self.journal = None
+
+    def on_collection_did_load(self, col):
+        self.deck_index.invalidate()
+        self.refresh_cram_deck_ids()
+        if self.dialog is not None:
+            self.dialog.on_decks_changed()
+
+    def on_operation_did_execute(self, changes, handler):
+        if changes.deck:
+            self.deck_index.invalidate()
+            self.cram_deck_ids_stale = True
+            if self.dialog is not None:
+                self.dialog.on_decks_changed()
+
     def show_dialog(self):
-        dialog = AnkiCramDialog(mw)
-        dialog.exec()
+        if self.dialog is not None and self.dialog.isVisible():
+            self.dialog.raise_()
+            self.dialog.activateWindow()
+            return
+        if self.dialog is None:
+            from .dialog import AnkiCramDialog
+            ensure_fonts()
+            self.dialog = profiler.call("show_dialog", AnkiCramDialog, mw)
+        else:
+            profiler.call("show_dialog", self.dialog.prepare)
+        self.dialog.exec()
+
+    def close_dialog(self):
+        if self.dialog is None:
+            return
+        self.dialog.stop_live_stats()
+        self.dialog.hide()
+        self.dialog.deleteLater()
+        self.dialog = None
 
     def show_changelog(self):
+        from .Changelog import ChangelogDialog
+        ensure_fonts()
         dialog = ChangelogDialog(mw)
         dialog.exec()
 
     def check_for_update(self):
         if not self.manager_name:
             return
-            
-        config = mw.addonManager.getConfig(self.manager_name) or {}
+
+        config = self.get_config()
         last_version = config.get("last_version", "v1.0.0")
         
         if last_version != VERSION:
@@ -49,6 +286,8 @@ class AnkiCramAddon:
 
     def show_corner_widget(self):
         if not self.corner_widget:
+            from .widgets import CramCornerWidget
+            ensure_fonts()
             self.corner_widget = CramCornerWidget(mw)
         self.corner_widget.show()
         self.corner_widget.update_position()
@@ -57,6 +296,7 @@ class AnkiCramAddon:
         if self.corner_widget:
             self.corner_widget.hide()
 
+    @profiler.timed("on_answer_card")
     def on_answer_card(self, reviewer, card, ease):
         if not self.is_active_session():
             return
@@ -66,17 +306,50 @@ class AnkiCramAddon:
             return
 
         self.session_cards_reviewed += 1
+        self.notify_stats_changed()
 
         try:
             ease_int = int(ease)
         except (ValueError, TypeError):
             return
 
-        if ease_int == 1:
+        try:
+            taken_ms = card.time_taken()
+        except Exception:
+            taken_ms = 0
+        self.answer_log.append(card.id, ease_int, taken_ms=taken_ms)
+
+        failed = ease_int == 1
+        if failed:
             self.session_cards_failed += 1
             if self.infinite_loop_enabled:
                 self.failed_cards.add(card.id)
         else:
             self.failed_cards.discard(card.id)
 
+        if self.infinite_loop_enabled:
+            self.requeue_card(card.id, failed)
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def requeue_card(self, card_id, failed):
+        park, release = self.requeue.on_answer(card_id, failed)
+        try:
+            if self.requeue:
+                in_deck = mw.col.db.scalar("SELECT count() FROM cards WHERE did = ?", self.current_cram_did)
+                if in_deck <= len(self.requeue):
+                    release.extend(self.requeue.release_all())
+                    park = [cid for cid in park if cid not in release]
+            if not park and not release:
+                return
+
+            undo_step = mw.col.undo_status().last_step
+            if park:
+                park_cards(mw.col, park, self.current_cram_did, int(time.time()) + PARK_SECONDS)
+            if release:
+                release_cards(mw.col, release, self.current_cram_did, self.journal)
+            mw.col.merge_undo_entries(undo_step)
+        except Exception:
+            pass
+
 
@@ -0,0 +1,101 @@
+import sys
+import time
+from aqt.qt import *
+
+FRAME_INTERVAL = 16
+ANIMATIONS_ENABLED = sys.platform != "win32"
+
+
+def lerp_color(c1, c2, factor):
+    r = c1.red() + (c2.red() - c1.red()) * factor
+    g = c1.green() + (c2.green() - c1.green()) * factor
+    b = c1.blue() + (c2.blue() - c1.blue()) * factor
+    a = c1.alpha() + (c2.alpha() - c1.alpha()) * factor
+    return QColor(int(r), int(g), int(b), int(a))
+
+
+def ease_out_cubic(t):
+    t = 1.0 - t
+    return 1.0 - t * t * t
+
+
+class _Transition:
+    __slots__ = ("start", "end", "value", "started_at", "duration", "on_value", "group")
+
+    def __init__(self, start, end, duration, on_value, group):
+        self.start = start
+        self.end = end
+        self.value = start
+        self.started_at = time.perf_counter()
+        self.duration = duration
+        self.on_value = on_value
+        self.group = group
+
+
+class AnimationDriver(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._transitions = {}
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(FRAME_INTERVAL)
+        self._timer.timeout.connect(self._tick)
+
+    def __len__(self):
+        return len(self._transitions)
+
+    def animate(self, key, start, end, duration, on_value, group=None):
+        current = self._transitions.get(key)
+        if current is not None:
+            start = current.value
+        if not ANIMATIONS_ENABLED or start == end:
+            self._transitions.pop(key, None)
+            on_value(end)
+            return
+
+        self._transitions[key] = _Transition(start, end, duration * abs(end - start), on_value, group)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def stop(self, key):
+        self._transitions.pop(key, None)
+        if not self._transitions:
+            self._timer.stop()
+
+    def stop_group(self, group):
+        for key in [key for key, t in self._transitions.items() if t.group is group]:
+            del self._transitions[key]
+        if not self._transitions:
+            self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        changed = []
+        for key, t in list(self._transitions.items()):
+            progress = min(1.0, (now - t.started_at) * 1000 / t.duration) if t.duration > 0 else 1.0
+            value = t.start + (t.end - t.start) * ease_out_cubic(progress)
+            if progress >= 1.0:
+                value = t.end
+                del self._transitions[key]
+            if value != t.value:
+                t.value = value
+                changed.append((key, t, value))
+
+        for key, t, value in changed:
+            try:
+                t.on_value(value)
+            except RuntimeError:
+                self._transitions.pop(key, None)
+
+        if not self._transitions:
+            self._timer.stop()
+
+
+_driver = None
+
+
+def animation_driver():
+    global _driver
+    if _driver is None:
+        _driver = AnimationDriver(QApplication.instance())
+    return _driver
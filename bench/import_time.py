@@ -0,0 +1,93 @@
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "ankicram"
+WARM_MODULES = ("aqt", "aqt.qt", "aqt.utils", "aqt.operations", "aqt.overview", "anki.collection")
+
+
+def import_addon(root):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    for name in WARM_MODULES:
+        importlib.import_module(name)
+
+    import aqt
+    from aqt.qt import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    aqt.mw = SimpleNamespace(
+        pm=None,
+        addonManager=SimpleNamespace(
+            getConfig=lambda name: {},
+            setConfigUpdatedAction=lambda name, fn: None,
+        ),
+    )
+
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, os.path.join(root, "__init__.py"), submodule_search_locations=[root]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+    elapsed = time.perf_counter() - start
+
+    version = sys.modules[f"{PACKAGE}.version"].VERSION
+    aqt.mw.addonManager.getConfig = lambda name: {"last_version": version}
+    start = time.perf_counter()
+    module.addon.check_for_update()
+    deferred = time.perf_counter() - start
+
+    loaded = sorted(name[len(PACKAGE) + 1:] for name in sys.modules if name.startswith(PACKAGE + "."))
+    return {"seconds": elapsed, "deferred_seconds": deferred, "modules": loaded}
+
+
+def measure_import(samples=5, root=ROOT):
+    times = []
+    deferred = []
+    modules = []
+    for _ in range(samples):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--root", root],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        deferred.append(result["deferred_seconds"])
+        modules = result["modules"]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "deferred_median": statistics.median(deferred),
+        "runs": samples,
+        "modules": modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long importing AnkiCram takes in a warm Anki process")
+    parser.add_argument("--root", default=ROOT, help="add-on checkout to import (e.g. a worktree of an older commit)")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(import_addon(os.path.abspath(args.root))))
+        return 0
+
+    result = measure_import(args.samples, os.path.abspath(args.root))
+    print(f"import {result['median'] * 1000:.1f} ms median, {result['min'] * 1000:.1f} ms min over {result['runs']} runs")
+    print(f"deferred startup (update check) {result['deferred_median'] * 1000:.1f} ms median")
+    print(f"modules loaded: {', '.join(result['modules'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
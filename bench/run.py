@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "ankicram"
+DEFAULT_SIZES = (1000, 10000, 100000, 500000)
+
+
+def load_addon_package():
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ROOT]
+        sys.modules[PACKAGE] = package
+
+
+def install_main_window():
+    import aqt
+    from aqt.qt import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    aqt.mw = SimpleNamespace(
+        col=None,
+        pm=SimpleNamespace(name="bench"),
+        addonManager=None,
+        taskman=None,
+        ankicram_addon=None,
+    )
+    return app, aqt.mw
+
+
+def measure(fn, repeat=3, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def run_size(size, args, app, mw):
+    from synthetic import build_collection
+    from ankicram import engine
+    from ankicram.addon import AnkiCramAddon
+    from ankicram.dialog import AnkiCramDialog
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        col, root_did = build_collection(
+            os.path.join(tmp, "bench.anki2"), size, args.decks, args.depth, args.tags, args.seed
+        )
+        elapsed = time.perf_counter() - start
+        results["generate_collection"] = {"min": elapsed, "median": elapsed, "runs": 1}
+
+        mw.col = col
+        addon = AnkiCramAddon()
+        mw.ankicram_addon = addon
+        deck_index = addon.deck_index
+        deck_ids = deck_index.descendant_ids(root_did)
+        cram_name = f"{engine.CRAM_PREFIX}Bench"
+
+        def rebuild_index():
+            deck_index.invalidate()
+            deck_index.descendant_ids(root_did)
+            deck_index.cram_decks()
+
+        results["deck_index"] = measure(rebuild_index, args.repeat)
+        results["get_active_cram_deck"] = measure(deck_index.cram_decks, args.repeat)
+        tag_filter = engine.TagFilter("topic1, topic2::*, -topic3")
+        results["tag_filter"] = measure(lambda: engine.collect_card_ids(col, deck_ids, tag_filter), args.repeat)
+
+        start_times, rebuild_times, stop_times = [], [], []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            cram_did, _ = engine.build_cram_deck(col, cram_name, deck_ids)
+            start_times.append(time.perf_counter() - t)
+
+            col.db.execute(
+                "UPDATE cards SET did = odid, due = odue, odid = 0, odue = 0 WHERE did = ? AND id % 2 = 0",
+                cram_did,
+            )
+            t = time.perf_counter()
+            engine.rebuild_cram_deck(col, cram_did, deck_ids)
+            rebuild_times.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            engine.end_cram_deck(col, cram_did)
+            stop_times.append(time.perf_counter() - t)
+
+        for key, times in (("start_cramming", start_times), ("rebuild_deck", rebuild_times), ("stop_cramming", stop_times)):
+            results[key] = {"min": min(times), "median": statistics.median(times), "runs": args.repeat}
+
+        def build_dialog():
+            dialog = AnkiCramDialog(None)
+            dialog.deleteLater()
+            app.processEvents()
+
+        deck_index.invalidate()
+        results["dialog_construction"] = measure(build_dialog, args.repeat)
+
+        dialog = AnkiCramDialog(None)
+        results["dialog_reopen"] = measure(dialog.prepare, args.repeat)
+        dialog.deleteLater()
+        app.processEvents()
+
+        mw.col = None
+        mw.ankicram_addon = None
+        col.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, scenarios in results["results"].items():
+        for name, timing in scenarios.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base or not base["median"]:
+                continue
+            ratio = timing["median"] / base["median"]
+            timing["baseline_ratio"] = ratio
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AnkiCram benchmarks")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated card counts")
+    parser.add_argument("--decks", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--tags", type=int, default=3, help="tags per note")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--import-samples", type=int, default=5,
+                        help="fresh processes used to time the add-on import (0 to skip)")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline median (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    load_addon_package()
+    app, mw = install_main_window()
+
+    output = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "decks": args.decks,
+            "depth": args.depth,
+            "tags_per_note": args.tags,
+            "repeat": args.repeat,
+            "timestamp": int(time.time()),
+        },
+        "results": {},
+    }
+
+    if args.import_samples > 0:
+        from import_time import measure_import
+
+        print("Benchmarking add-on import...", flush=True)
+        startup = measure_import(args.import_samples)
+        modules = startup.pop("modules")
+        output["results"]["startup"] = {"addon_import": startup}
+        print(f"  {'addon_import':<22} {startup['median'] * 1000:10.1f} ms")
+        print(f"  {'deferred_startup':<22} {startup['deferred_median'] * 1000:10.1f} ms")
+        print(f"  modules loaded: {', '.join(modules)}")
+
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        print(f"Benchmarking {size} cards...", flush=True)
+        output["results"][str(size)] = run_size(size, args, app, mw)
+        for name, timing in output["results"][str(size)].items():
+            print(f"  {name:<22} {timing['median'] * 1000:10.1f} ms")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(output, json.load(f), args.tolerance)
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    for size, name, ratio in regressions:
+        print(f"REGRESSION {size} {name}: {ratio:.2f}x baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
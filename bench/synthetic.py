@@ -0,0 +1,46 @@
+import random
+
+from anki.collection import Collection
+
+ROOT_DECK = "Bench"
+
+
+def deck_names(deck_count, depth):
+    branching = max(2, round(deck_count ** (1 / max(depth, 1))))
+    names = [ROOT_DECK]
+    for i in range(1, deck_count):
+        parent = names[(i - 1) // branching]
+        names.append(f"{parent}::D{i}")
+    return names
+
+
+def tag_pool(tags_per_note):
+    pool = []
+    for topic in range(max(tags_per_note * 4, 8)):
+        pool.append(f"topic{topic}")
+        pool.append(f"topic{topic}::sub{topic % 3}")
+    return pool
+
+
+def build_collection(path, cards, deck_count=100, depth=3, tags_per_note=3, seed=0):
+    rng = random.Random(seed)
+    col = Collection(path)
+    notetype = col.models.by_name("Basic")
+    deck_ids = [col.decks.id(name) for name in deck_names(deck_count, depth)]
+    tags = tag_pool(tags_per_note)
+
+    requests = []
+    for i in range(cards):
+        note = col.new_note(notetype)
+        note["Front"] = f"front {i}"
+        note["Back"] = f"back {i}"
+        note.tags = rng.sample(tags, tags_per_note)
+        requests.append((note, deck_ids[i % len(deck_ids)]))
+
+    if hasattr(col, "add_notes"):
+        from anki.collection import AddNoteRequest
+        col.add_notes([AddNoteRequest(note=note, deck_id=did) for note, did in requests])
+    else:
+        for note, did in requests:
+            col.add_note(note, did)
+    return col, deck_ids[0]
@@ -0,0 +1,96 @@
+from aqt import mw
+from .engine import CRAM_PREFIX
+
+
+class DeckIndex:
+    def __init__(self):
+        self._decks = None
+        self._names = {}
+        self._children = {}
+        self._cram_ids = []
+        self._filtered = None
+
+    def invalidate(self):
+        self._decks = None
+        self._names = {}
+        self._children = {}
+        self._cram_ids = []
+        self._filtered = None
+
+    def _ensure(self):
+        if self._decks is not None:
+            return
+        decks = []
+        ids_by_name = {}
+        for deck in mw.col.decks.all_names_and_ids():
+            decks.append((deck.name, deck.id))
+            ids_by_name[deck.name] = deck.id
+            self._names[deck.id] = deck.name
+            if deck.name.startswith(CRAM_PREFIX):
+                self._cram_ids.append(deck.id)
+
+        for name, did in decks:
+            parent_name, sep, _ = name.rpartition("::")
+            if sep and parent_name in ids_by_name:
+                self._children.setdefault(ids_by_name[parent_name], []).append(did)
+        self._decks = decks
+
+    def all(self):
+        self._ensure()
+        return self._decks
+
+    def name(self, deck_id):
+        self._ensure()
+        return self._names.get(deck_id)
+
+    def __contains__(self, deck_id):
+        self._ensure()
+        return deck_id in self._names
+
+    def descendant_ids(self, deck_id, include_self=True):
+        self._ensure()
+        if deck_id not in self._names:
+            return []
+        result = [deck_id] if include_self else []
+        stack = list(self._children.get(deck_id, ()))
+        while stack:
+            did = stack.pop()
+            result.append(did)
+            stack.extend(self._children.get(did, ()))
+        return result
+
+    def subtree_ids(self, deck_ids):
+        result = []
+        seen = set()
+        for deck_id in deck_ids:
+            if deck_id in seen:
+                continue
+            for did in self.descendant_ids(deck_id):
+                if did not in seen:
+                    seen.add(did)
+                    result.append(did)
+        return result
+
+    def is_filtered(self, deck_id):
+        return deck_id in self.filtered_ids()
+
+    def filtered_ids(self):
+        self._ensure()
+        if self._filtered is None:
+            self._filtered = self._lookup_filtered()
+        return self._filtered
+
+    def _lookup_filtered(self):
+        try:
+            normal_ids = {deck.id for deck in mw.col.decks.all_names_and_ids(include_filtered=False)}
+            return frozenset(did for did in self._names if did not in normal_ids)
+        except Exception:
+            return frozenset(d['id'] for d in mw.col.decks.all() if d.get('dyn', 0))
+
+    def cram_deck_ids(self):
+        self._ensure()
+        return list(self._cram_ids)
+
+    def cram_decks(self):
+        self._ensure()
+        return [(self._names[did], did) for did in self._cram_ids]
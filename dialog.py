@@ -1,11 +1,19 @@
+import os
 import time
 from aqt import mw
 from aqt.qt import *
 from aqt.utils import tooltip, showInfo
 from .theme import THEME, STYLESHEET
-from .widgets import ClickableLabel, StatCard, DeckSelectButton, RoundedWidget, RoundedButton
+from .engine import CRAM_PREFIX, CramCancelled, TagFilter, build_cram_deck, cram_deck_name, end_cram_deck, keep_cram_deck, rebuild_cram_deck
+from .history import SessionHistory
+from .profiling import profiler
+from .search import DeckSearchIndex
+from .tasks import CramTask, apply_op_changes
+from .widgets import ClickableLabel, StatCard, DeckListModel, DeckListView, RoundedWidget, RoundedButton
 from .About import AboutDialog
 
+HISTORY_PAGE_SIZE = 20
+
 
 class AnkiCramDialog(QDialog):
     def __init__(self, parent=None):
@@ -15,10 +23,17 @@ class AnkiCramDialog(QDialog):
         self.setMinimumWidth(650)
         self.setMinimumHeight(600)
 
-        self.deck_buttons = []
+        self.deck_model = None
+        self.deck_search = None
+        self.deck_view = None
+        self.deck_error_lbl = None
+        self.search_input = None
         self.tag_input = None
         self.infinite_loop_check = None
         self.persistent_deck_check = None
+        self.task = None
+        self.progress_bar = None
+        self.progress_label = None
 
         self.central = RoundedWidget(
             bg_color=THEME['bg'],
@@ -43,16 +58,25 @@ class AnkiCramDialog(QDialog):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.layout.setSpacing(0)
 
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(self.filter_decks)
+
+        self.stat_cards = {}
+        self.stats_refresh_pending = False
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.schedule_stats_refresh)
+
         self.setup_header()
 
-        self.content_widget = QWidget()
-        self.content_widget.setStyleSheet("background: transparent; border: none;")
-        self.content_layout = QVBoxLayout()
-        self.content_layout.setContentsMargins(40, 30, 40, 30)
-        self.content_layout.setSpacing(25)
-        self.content_widget.setLayout(self.content_layout)
-        self.layout.addWidget(self.content_widget)
+        self.pages = {}
+        self.stack = QStackedWidget()
+        self.stack.setStyleSheet("background: transparent; border: none;")
+        self.layout.addWidget(self.stack)
 
+        self.decks_dirty = True
         self.setup_body()
         self._drag_pos = None
 
@@ -130,32 +154,50 @@ class AnkiCramDialog(QDialog):
         header.setLayout(h_layout)
         self.layout.addWidget(header)
 
-    def setup_body(self):
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                self.clear_layout(item.layout())
+    def page(self, name):
+        page = self.pages.get(name)
+        if page is None:
+            page = QWidget()
+            layout = QVBoxLayout(page)
+            layout.setContentsMargins(40, 30, 40, 30)
+            layout.setSpacing(25)
+            getattr(self, f"build_{name}_page")(layout)
+            self.stack.addWidget(page)
+            self.pages[name] = page
+        return page
+
+    def show_page(self, name):
+        page = self.page(name)
+        if name != "session":
+            self.stop_live_stats()
+        if name != "selection":
+            self.search_timer.stop()
+        self.stack.setCurrentWidget(page)
 
+    def setup_body(self):
         active_cram = self.get_active_cram_deck()
         if active_cram:
-            self.setup_active_session_ui(active_cram)
+            self.show_session_page(active_cram)
         else:
-            self.setup_deck_selection_ui()
+            self.show_selection_page()
 
-    def clear_layout(self, layout):
-        while layout.count():
-            item = layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                self.clear_layout(item.layout())
+    def prepare(self):
+        if self.search_input is not None and self.search_input.text():
+            self.search_input.clear()
+        self.setup_body()
 
-    def setup_deck_selection_ui(self):
-        lbl = QLabel("Select a deck to cram")
+    def build_selection_page(self, layout):
+        title_row = QHBoxLayout()
+        lbl = QLabel("Select decks to cram")
         lbl.setStyleSheet(f"font-size: 18px; font-weight: 600; color: {THEME['text']}; border: none;")
-        self.content_layout.addWidget(lbl)
+        history_link = ClickableLabel("History")
+        history_link.setStyleSheet(f"font-size: 13px; font-weight: 600; color: {THEME['text_muted']}; border: none; background: transparent;")
+        history_link.setCursor(Qt.CursorShape.PointingHandCursor)
+        history_link.clicked.connect(self.setup_history_ui)
+        title_row.addWidget(lbl)
+        title_row.addStretch()
+        title_row.addWidget(history_link)
+        layout.addLayout(title_row)
 
         search_input = QLineEdit()
         search_input.setPlaceholderText("🔍 Search decks...")
@@ -173,41 +215,22 @@ class AnkiCramDialog(QDialog):
                 background: {THEME['glass_hover']};
             }}
         """)
-        search_input.textChanged.connect(self.filter_decks)
-        self.content_layout.addWidget(search_input)
-
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.Shape.NoFrame)
-        scroll.setStyleSheet("background: transparent; border: none;")
-
-        self.deck_container = QWidget()
-        self.deck_container.setStyleSheet("background: transparent;")
-        self.deck_layout = QVBoxLayout()
-        self.deck_layout.setSpacing(10)
-        self.deck_layout.setContentsMargins(0, 0, 10, 0)
-        self.deck_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.deck_container.setLayout(self.deck_layout)
-        scroll.setWidget(self.deck_container)
-
-        self.deck_buttons = []
-        try:
-            for deck in mw.col.decks.all_names_and_ids():
-                if not deck.name.startswith("AnkiCram - ") and not self._is_filtered_deck(deck.id):
-                    btn = DeckSelectButton(deck.name, deck.id)
-                    btn.clicked.connect(lambda checked, b=btn: self.handle_deck_selection(b))
-                    self.deck_layout.addWidget(btn)
-                    self.deck_buttons.append(btn)
-        except Exception as e:
-            error_lbl = QLabel(f"Error loading decks: {str(e)}")
-            error_lbl.setStyleSheet(f"color: {THEME['danger']}; border: none;")
-            self.deck_layout.addWidget(error_lbl)
-
-        if self.deck_buttons:
-            self.deck_buttons[0].setChecked(True)
-            self.deck_buttons[0].update_style()
-
-        self.content_layout.addWidget(scroll, 1)
+        self.search_input = search_input
+        search_input.textChanged.connect(lambda _: self.search_timer.start())
+        layout.addWidget(search_input)
+
+        self.deck_model = DeckListModel((), self)
+        self.deck_search = DeckSearchIndex(())
+        self.deck_view = DeckListView()
+        self.deck_view.setModel(self.deck_model)
+        self.deck_view.setToolTip("Ctrl-click (⌘-click on macOS) to cram several decks together")
+        layout.addWidget(self.deck_view, 1)
+
+        self.deck_error_lbl = QLabel()
+        self.deck_error_lbl.setStyleSheet(f"color: {THEME['danger']}; border: none;")
+        self.deck_error_lbl.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.deck_error_lbl.hide()
+        layout.addWidget(self.deck_error_lbl, 1)
 
         settings_frame = QFrame()
         settings_frame.setStyleSheet(f"background: {THEME['glass']}; border: 1px solid {THEME['glass_border']}; border-radius: 10px;")
@@ -228,13 +251,13 @@ class AnkiCramDialog(QDialog):
         tag_icon = QLabel("🏷️")
         tag_icon.setStyleSheet("border: none; font-size: 16px;")
         self.tag_input = QLineEdit()
-        self.tag_input.setPlaceholderText("Filter by tags (e.g. 'important')...")
+        self.tag_input.setPlaceholderText("Filter by tags (e.g. 'important, bio::*, -hard')...")
         tag_row.addWidget(tag_icon)
         tag_row.addWidget(self.tag_input)
         settings_layout.addLayout(tag_row)
 
         settings_frame.setLayout(settings_layout)
-        self.content_layout.addWidget(settings_frame)
+        layout.addWidget(settings_frame)
 
         self.start_btn = RoundedButton(
             text="Start Cram Session",
@@ -252,18 +275,55 @@ class AnkiCramDialog(QDialog):
         start_font.setPixelSize(16)
         start_font.setWeight(QFont.Weight.Bold)
         self.start_btn.setFont(start_font)
-        self.start_btn.clicked.connect(self.start_cramming)
+        self.start_btn.clicked.connect(lambda: self.start_cramming())
 
         btn_shadow = QGraphicsDropShadowEffect(self.start_btn)
         btn_shadow.setBlurRadius(25)
         btn_shadow.setColor(QColor(167, 139, 250, 80))
         btn_shadow.setOffset(0, 8)
         self.start_btn.setGraphicsEffect(btn_shadow)
-        self.content_layout.addWidget(self.start_btn)
+        layout.addWidget(self.start_btn)
+
+    def show_selection_page(self):
+        self.show_page("selection")
+        if self.decks_dirty:
+            self.refresh_decks()
+
+    def visible_decks(self):
+        deck_index = mw.ankicram_addon.deck_index
+        hidden_ids = deck_index.filtered_ids().union(deck_index.cram_deck_ids())
+        return [
+            (deck_name, deck_id) for deck_name, deck_id in deck_index.all()
+            if deck_id not in hidden_ids
+        ]
+
+    def refresh_decks(self):
+        if self.deck_model is None:
+            return
+        try:
+            decks = self.visible_decks()
+        except Exception as e:
+            self.deck_error_lbl.setText(f"Error loading decks: {str(e)}")
+            self.deck_error_lbl.show()
+            self.deck_view.hide()
+            return
+        self.decks_dirty = False
+        self.deck_error_lbl.hide()
+        self.deck_view.show()
 
-    def setup_active_session_ui(self, active_cram):
-        addon = mw.ankicram_addon
+        self.deck_search = DeckSearchIndex(decks)
+        if self.search_input.text().strip():
+            self.deck_model.set_decks(decks, rows=self.deck_search.search(self.search_input.text()))
+        else:
+            self.deck_model.set_decks(decks)
+        self.deck_model.prune_selection()
+
+    def on_decks_changed(self):
+        self.decks_dirty = True
+        if self.isVisible() and self.stack.currentWidget() is self.pages.get("selection"):
+            self.refresh_decks()
 
+    def build_session_page(self, layout):
         info_frame = QFrame()
         info_frame.setStyleSheet(f"background: rgba(167, 139, 250, 0.1); border-radius: 10px; border: 1px solid {THEME['primary']};")
         info_layout = QVBoxLayout()
@@ -271,29 +331,30 @@ class AnkiCramDialog(QDialog):
 
         status_lbl = QLabel("CURRENTLY CRAMMING")
         status_lbl.setStyleSheet(f"font-size: 11px; font-weight: 700; color: {THEME['primary']}; letter-spacing: 1px; border: none; background: transparent;")
-        deck_lbl = QLabel(active_cram['original_name'])
-        deck_lbl.setStyleSheet(f"font-size: 22px; font-weight: 700; color: white; margin-top: 5px; border: none; background: transparent;")
+        self.session_deck_lbl = QLabel()
+        self.session_deck_lbl.setStyleSheet(f"font-size: 22px; font-weight: 700; color: white; margin-top: 5px; border: none; background: transparent;")
 
         info_layout.addWidget(status_lbl)
-        info_layout.addWidget(deck_lbl)
+        info_layout.addWidget(self.session_deck_lbl)
         info_frame.setLayout(info_layout)
-        self.content_layout.addWidget(info_frame)
+        layout.addWidget(info_frame)
 
         stats_grid = QGridLayout()
         stats_grid.setSpacing(15)
 
-        elapsed = (time.time() - addon.session_start_time) / 60 if addon.session_start_time else 0
-        retention = 0
-        if addon.session_cards_reviewed > 0:
-            retention = ((addon.session_cards_reviewed - addon.session_cards_failed) / addon.session_cards_reviewed) * 100
+        self.session_stat_cards = {
+            "time": StatCard("⏱️", "Time", ""),
+            "reviews": StatCard("✅", "Reviews", ""),
+            "retention": StatCard("🧠", "Retention", "", THEME['secondary']),
+            "reloops": StatCard("🔄", "Re-Loops", "", THEME['primary']),
+        }
+        stats_grid.addWidget(self.session_stat_cards["time"], 0, 0)
+        stats_grid.addWidget(self.session_stat_cards["reviews"], 0, 1)
+        stats_grid.addWidget(self.session_stat_cards["retention"], 1, 0)
+        stats_grid.addWidget(self.session_stat_cards["reloops"], 1, 1)
 
-        stats_grid.addWidget(StatCard("⏱️", "Time", f"{elapsed:.0f}m"), 0, 0)
-        stats_grid.addWidget(StatCard("✅", "Reviews", str(addon.session_cards_reviewed)), 0, 1)
-        stats_grid.addWidget(StatCard("🧠", "Retention", f"{retention:.0f}%", THEME['secondary']), 1, 0)
-        stats_grid.addWidget(StatCard("🔄", "Re-Loops", str(addon.session_reloops), THEME['primary']), 1, 1)
-
-        self.content_layout.addLayout(stats_grid)
-        self.content_layout.addStretch()
+        layout.addLayout(stats_grid)
+        layout.addStretch()
 
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(15)
@@ -312,7 +373,7 @@ class AnkiCramDialog(QDialog):
         rebuild_font.setPixelSize(13)
         rebuild_font.setWeight(QFont.Weight.DemiBold)
         rebuild_btn.setFont(rebuild_font)
-        rebuild_btn.clicked.connect(self.rebuild_deck)
+        rebuild_btn.clicked.connect(lambda: self.rebuild_deck())
 
         stop_btn = RoundedButton(
             text="End Session",
@@ -329,35 +390,230 @@ class AnkiCramDialog(QDialog):
         stop_font.setPixelSize(13)
         stop_font.setWeight(QFont.Weight.DemiBold)
         stop_btn.setFont(stop_font)
-        stop_btn.clicked.connect(self.stop_cramming)
+        stop_btn.clicked.connect(lambda: self.stop_cramming())
 
         btn_layout.addWidget(rebuild_btn)
         btn_layout.addWidget(stop_btn)
-        self.content_layout.addLayout(btn_layout)
+        layout.addLayout(btn_layout)
+
+    def show_session_page(self, active_cram):
+        self.show_page("session")
+        self.session_deck_lbl.setText(active_cram['original_name'])
+        self.stat_cards = self.session_stat_cards
+        self.refresh_stats()
+        mw.ankicram_addon.add_stats_listener(self.schedule_stats_refresh)
+        self.stats_timer.start()
+
+    def build_history_page(self, layout):
+        title_row = QHBoxLayout()
+        lbl = QLabel("Session history")
+        lbl.setStyleSheet(f"font-size: 18px; font-weight: 600; color: {THEME['text']}; border: none;")
+        back_link = ClickableLabel("← Back")
+        back_link.setStyleSheet(f"font-size: 13px; font-weight: 600; color: {THEME['text_muted']}; border: none; background: transparent;")
+        back_link.setCursor(Qt.CursorShape.PointingHandCursor)
+        back_link.clicked.connect(self.setup_body)
+        title_row.addWidget(lbl)
+        title_row.addStretch()
+        title_row.addWidget(back_link)
+        layout.addLayout(title_row)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.Shape.NoFrame)
+        scroll.setStyleSheet("background: transparent; border: none;")
+        history_container = QWidget()
+        history_container.setStyleSheet("background: transparent;")
+        self.history_layout = QVBoxLayout()
+        self.history_layout.setSpacing(10)
+        self.history_layout.setContentsMargins(0, 0, 10, 0)
+        self.history_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        history_container.setLayout(self.history_layout)
+        scroll.setWidget(history_container)
+        layout.addWidget(scroll, 1)
+
+        self.history_more_btn = RoundedButton(
+            text="Load more",
+            radius=25,
+            bg_color="transparent",
+            hover_color=THEME['glass_hover'],
+            text_color=THEME['text'],
+            border_color=THEME['glass_border'],
+            border_width=1
+        )
+        self.history_more_btn.setFixedHeight(50)
+        more_font = QFont("Inter")
+        more_font.setPixelSize(13)
+        more_font.setWeight(QFont.Weight.DemiBold)
+        self.history_more_btn.setFont(more_font)
+        self.history_more_btn.clicked.connect(self.load_history_page)
+        layout.addWidget(self.history_more_btn)
+
+    def setup_history_ui(self):
+        self.show_page("history")
+        while self.history_layout.count():
+            item = self.history_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        self.history_cursor = None
+        self.load_history_page()
+
+    def load_history_page(self):
+        try:
+            rows = mw.ankicram_addon.history_page(HISTORY_PAGE_SIZE, self.history_cursor)
+        except Exception as e:
+            rows = []
+            error_lbl = QLabel(f"Error loading history: {str(e)}")
+            error_lbl.setStyleSheet(f"color: {THEME['danger']}; border: none;")
+            self.history_layout.addWidget(error_lbl)
+
+        if not rows and self.history_cursor is None:
+            empty_lbl = QLabel("No finished sessions yet.")
+            empty_lbl.setStyleSheet(f"font-size: 13px; color: {THEME['text_muted']}; border: none;")
+            self.history_layout.addWidget(empty_lbl)
+
+        for row in rows:
+            self.history_layout.addWidget(self.history_row(row))
+        if rows:
+            self.history_cursor = SessionHistory.cursor(rows[-1])
+        self.history_more_btn.setVisible(len(rows) == HISTORY_PAGE_SIZE)
+
+    def history_row(self, row):
+        frame = QFrame()
+        frame.setStyleSheet(f"background: {THEME['glass']}; border: 1px solid {THEME['glass_border']}; border-radius: 10px;")
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 12, 20, 12)
+        layout.setSpacing(4)
+
+        top_row = QHBoxLayout()
+        deck_lbl = QLabel(row["deck_name"])
+        deck_lbl.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {THEME['text']}; background: transparent; border: none;")
+        date_lbl = QLabel(time.strftime("%d %b %Y, %H:%M", time.localtime(row["started_at"])))
+        date_lbl.setStyleSheet(f"font-size: 11px; color: {THEME['text_muted']}; background: transparent; border: none;")
+        top_row.addWidget(deck_lbl)
+        top_row.addStretch()
+        top_row.addWidget(date_lbl)
+
+        retention = 0
+        if row["reviews"] > 0:
+            retention = (row["reviews"] - row["failures"]) / row["reviews"] * 100
+        stats_lbl = QLabel(
+            f"⏱️ {row['duration'] / 60:.0f}m   ✅ {row['reviews']}   "
+            f"🧠 {retention:.0f}%   🔄 {row['reloops']}   📦 {row['cards_moved']} cards"
+        )
+        stats_lbl.setStyleSheet(f"font-size: 12px; color: {THEME['text_muted']}; background: transparent; border: none;")
+
+        bottom_row = QHBoxLayout()
+        bottom_row.addWidget(stats_lbl)
+        bottom_row.addStretch()
+        answers_path = mw.ankicram_addon.answer_export_path(row["id"])
+        if os.path.exists(answers_path):
+            answers_link = ClickableLabel("Answers ↗")
+            answers_link.setToolTip("Open this session's answer log (CSV)")
+            answers_link.setStyleSheet(f"font-size: 12px; font-weight: 600; color: {THEME['primary']}; background: transparent; border: none;")
+            answers_link.setCursor(Qt.CursorShape.PointingHandCursor)
+            answers_link.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(answers_path)))
+            bottom_row.addWidget(answers_link)
+
+        layout.addLayout(top_row)
+        layout.addLayout(bottom_row)
+        frame.setLayout(layout)
+        return frame
+
+    def session_stat_values(self):
+        addon = mw.ankicram_addon
+        elapsed = (time.time() - addon.session_start_time) / 60 if addon.session_start_time else 0
+        retention = 0
+        if addon.session_cards_reviewed > 0:
+            retention = ((addon.session_cards_reviewed - addon.session_cards_failed) / addon.session_cards_reviewed) * 100
+        return {
+            "time": f"{elapsed:.0f}m",
+            "reviews": str(addon.session_cards_reviewed),
+            "retention": f"{retention:.0f}%",
+            "reloops": str(addon.session_reloops),
+        }
+
+    def schedule_stats_refresh(self):
+        if not self.stats_refresh_pending:
+            self.stats_refresh_pending = True
+            QTimer.singleShot(16, self.refresh_stats)
+
+    def refresh_stats(self):
+        self.stats_refresh_pending = False
+        if not self.stat_cards:
+            return
+        for key, value in self.session_stat_values().items():
+            self.stat_cards[key].set_value(value)
+
+    def stop_live_stats(self):
+        self.stats_timer.stop()
+        self.stat_cards = {}
+        mw.ankicram_addon.remove_stats_listener(self.schedule_stats_refresh)
+
+    def done(self, result):
+        self.stop_live_stats()
+        super().done(result)
+
+    def build_progress_page(self, layout):
+        layout.addStretch()
+
+        self.progress_label = QLabel()
+        self.progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.progress_label.setStyleSheet(f"font-size: 18px; font-weight: 600; color: {THEME['text']}; border: none;")
+        layout.addWidget(self.progress_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(6)
+        self.progress_bar.setStyleSheet(f"""
+            QProgressBar {{
+                background: {THEME['glass']};
+                border: none;
+                border-radius: 3px;
+            }}
+            QProgressBar::chunk {{
+                background: {THEME['primary_grad']};
+                border-radius: 3px;
+            }}
+        """)
+        layout.addWidget(self.progress_bar)
+
+        layout.addStretch()
+
+        cancel_btn = RoundedButton(
+            text="Cancel",
+            radius=25,
+            bg_color="transparent",
+            hover_color=THEME['glass_hover'],
+            text_color=THEME['text'],
+            border_color=THEME['glass_border'],
+            border_width=1
+        )
+        cancel_btn.setFixedHeight(50)
+        cancel_font = QFont("Inter")
+        cancel_font.setPixelSize(13)
+        cancel_font.setWeight(QFont.Weight.DemiBold)
+        cancel_btn.setFont(cancel_font)
+        cancel_btn.clicked.connect(self.cancel_task)
+        layout.addWidget(cancel_btn)
+
+    def setup_progress_ui(self, title):
+        self.show_page("progress")
+        self.progress_label.setText(title)
+        self.progress_bar.setValue(0)
 
     def show_about_dialog(self):
         dialog = AboutDialog(self)
         dialog.exec()
 
-    def handle_deck_selection(self, clicked_btn):
-        if not self.deck_buttons:
-            return
-        for btn in self.deck_buttons:
-            if btn != clicked_btn:
-                btn.setChecked(False)
-                btn.update_style()
-        clicked_btn.setChecked(True)
-        clicked_btn.update_style()
-
-    def filter_decks(self, search_text):
-        if not self.deck_buttons:
+    def filter_decks(self):
+        if self.deck_model is None or self.search_input is None:
             return
-        search_text = search_text.lower()
-        for btn in self.deck_buttons:
-            if search_text in btn.deck_name.lower():
-                btn.show()
-            else:
-                btn.hide()
+        query = self.search_input.text()
+        if query.strip():
+            self.deck_model.set_rows(self.deck_search.search(query))
+        else:
+            self.deck_model.clear_filter()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -374,264 +630,205 @@ class AnkiCramDialog(QDialog):
     def mouseReleaseEvent(self, event):
         self._drag_pos = None
 
-    def _is_filtered_deck(self, deck_id):
-        try:
-            if hasattr(mw.col.decks, 'is_filtered'):
-                return mw.col.decks.is_filtered(deck_id)
-            deck = mw.col.decks.get(deck_id)
-            if deck:
-                return deck.get('dyn', 0) != 0
-            return False
-        except Exception:
-            return False
-
     def get_active_cram_deck(self):
-        for deck in mw.col.decks.all_names_and_ids():
-            if deck.name.startswith("AnkiCram - "):
-                return {
-                    "id": deck.id,
-                    "name": deck.name,
-                    "original_name": deck.name.replace("AnkiCram - ", "", 1)
-                }
-        return None
-
-    def rebuild_deck(self):
-        try:
-            addon = mw.ankicram_addon
-            if not addon.is_active_session():
-                tooltip("⚠️ No active session", period=1500)
+        addon = mw.ankicram_addon
+        if not addon.is_active_session():
+            return None
+        return {
+            "id": addon.current_cram_did,
+            "name": addon.current_cram_name,
+            "original_name": addon.current_cram_name.replace(CRAM_PREFIX, "", 1)
+        }
+
+    def run_task(self, title, op, on_success, error_title, name):
+        self.setup_progress_ui(title)
+        op = profiler.wrap(f"{name}.task", op)
+        on_success = profiler.wrap(f"{name}.finish", on_success)
+
+        def finished(result):
+            self.task = None
+            on_success(result)
+
+        def failed(error):
+            self.task = None
+            if isinstance(error, CramCancelled):
+                self.setup_body()
+                tooltip("Cancelled", period=1500)
                 return
+            self.handle_task_error(error_title, error)
 
-            original_did = addon.original_deck_id
-            if not original_did:
-                tooltip("⚠️ Original deck not found", period=1500)
-                return
+        self.task = CramTask(op, finished, failed, self.set_progress, self)
+        self.task.run()
 
-            cram_cards = mw.col.db.list(
-                "SELECT id FROM cards WHERE did = ?", addon.current_cram_did
-            )
-            for cid in cram_cards:
-                try:
-                    card = mw.col.get_card(cid)
-                    if card.odid != 0:
-                        card.did = card.odid
-                        card.odid = 0
-                        card.odue = 0
-                        mw.col.update_card(card)
-                except Exception:
-                    pass
-
-            original_deck = mw.col.decks.get(original_did)
-            if not original_deck:
-                tooltip("⚠️ Original deck not found", period=1500)
-                return
-            deck_name = original_deck['name']
+    def handle_task_error(self, error_title, error):
+        self.setup_body()
+        showInfo(f"{error_title}: {str(error)}")
 
-            deck_ids = [original_did]
-            for d in mw.col.decks.all_names_and_ids():
-                if d.name.startswith(deck_name + "::"):
-                    deck_ids.append(d.id)
+    def set_progress(self, percent):
+        if self.progress_bar is not None:
+            self.progress_bar.setValue(percent)
 
-            all_cards = []
-            for did in deck_ids:
-                deck_cards = mw.col.db.list(
-                    "SELECT id FROM cards WHERE did = ?", did
-                )
-                all_cards.extend(deck_cards)
-
-            cards_moved = 0
-            for cid in all_cards:
-                try:
-                    card = mw.col.get_card(cid)
-                    if card.odid != 0 or card.queue == -1:
-                        continue
-                    card.odid = card.did
-                    card.odue = card.due
-                    card.did = addon.current_cram_did
-                    card.due = -1
-                    card.queue = 1
-                    mw.col.update_card(card)
-                    cards_moved += 1
-                except Exception:
-                    pass
+    def cancel_task(self):
+        if self.task:
+            self.task.cancel()
+            self.progress_label.setText("Cancelling...")
+
+    def reject(self):
+        if self.task:
+            self.cancel_task()
+            return
+        super().reject()
+
+    @profiler.timed("rebuild_deck")
+    def rebuild_deck(self):
+        addon = mw.ankicram_addon
+        if not addon.is_active_session():
+            tooltip("⚠️ No active session", period=1500)
+            return
+
+        deck_ids = addon.deck_index.subtree_ids(addon.original_deck_ids or ())
+        if not deck_ids:
+            tooltip("⚠️ Original deck not found", period=1500)
+            return
 
+        cram_did = addon.current_cram_did
+        tag_filter = TagFilter(addon.tag_filter_text)
+
+        def on_success(result):
             addon.session_reloops += 1
-            tooltip(f"✅ Deck rebuilt! ({cards_moved} cards)", period=2000)
-            mw.reset()
+            addon.session_cards_moved += result.moved
+            addon.save_session()
+            addon.notify_stats_changed()
+            tooltip(f"✅ Deck rebuilt! ({result.moved} cards)", period=2000)
+            apply_op_changes(result.changes, self)
             self.accept()
-        except Exception as e:
-            showInfo(f"Rebuild Error: {str(e)}")
 
+        self.run_task(
+            "Rebuilding deck...",
+            lambda task: rebuild_cram_deck(mw.col, cram_did, deck_ids, tag_filter, task, addon.journal),
+            on_success,
+            "Rebuild Error",
+            "rebuild_deck"
+        )
+
+    @profiler.timed("start_cramming")
     def start_cramming(self):
-        try:
-            selected_btn = next((b for b in self.deck_buttons if b.isChecked()), None)
-            if not selected_btn:
-                tooltip("⚠️ Please select a deck first", period=1800)
-                return
+        selected = self.deck_model.selected_decks() if self.deck_model is not None else []
+        if not selected:
+            tooltip("⚠️ Please select a deck first", period=1800)
+            return
 
-            deck_name = selected_btn.deck_name
-            deck_id = selected_btn.deck_id
-            cram_name = f"AnkiCram - {deck_name}"
-
-            existing_id = mw.col.decks.id_for_name(cram_name)
-            if existing_id:
-                try:
-                    mw.col.sched.empty_filtered_deck(existing_id)
-                    mw.col.decks.remove([existing_id])
-                except Exception:
-                    pass
-
-            all_cards = []
-            deck_ids = [deck_id]
-            for d in mw.col.decks.all_names_and_ids():
-                if d.name.startswith(deck_name + "::"):
-                    deck_ids.append(d.id)
-
-            for did in deck_ids:
-                deck_cards = mw.col.db.list(
-                    "SELECT id FROM cards WHERE did = ?", did
-                )
-                all_cards.extend(deck_cards)
-
-            tag_filter = self.tag_input.text().strip() if self.tag_input else ""
-            if tag_filter and all_cards:
-                tags = [t.strip().lower() for t in tag_filter.split(",") if t.strip()]
-                if tags:
-                    filtered_cards = []
-                    for cid in all_cards:
-                        card = mw.col.get_card(cid)
-                        note = card.note()
-                        card_tags = [t.lower() for t in note.tags]
-                        if any(tag in card_tags for tag in tags):
-                            filtered_cards.append(cid)
-                    all_cards = filtered_cards
-
-            if not all_cards:
-                tooltip("⚠️ No cards found in this deck", period=3000)
+        addon = mw.ankicram_addon
+        deck_names = [name for name, _ in selected]
+        selected_ids = [deck_id for _, deck_id in selected]
+        cram_name = cram_deck_name(deck_names)
+        deck_ids = addon.deck_index.subtree_ids(selected_ids)
+        tag_text = self.tag_input.text().strip() if self.tag_input else ""
+        tag_filter = TagFilter(tag_text)
+        infinite_loop = self.infinite_loop_check.isChecked() if self.infinite_loop_check else True
+        persistent_deck = self.persistent_deck_check.isChecked() if self.persistent_deck_check else False
+
+        def on_success(ret):
+            cram_did, result = ret
+            addon.deck_index.invalidate()
+            self.decks_dirty = True
+
+            if cram_did is None:
+                apply_op_changes(result.changes, self)
+
+            if result.total == 0:
+                self.setup_body()
+                tooltip("⚠️ No cards found in the selected decks" if len(selected) > 1 else "⚠️ No cards found in this deck", period=3000)
                 return
 
-            cram_did = mw.col.decks.new_filtered(cram_name)
-            deck_obj = mw.col.decks.get(cram_did)
-            deck_obj["terms"] = [["deck:_*_nonexistent_*_", 9999, 5]]
-            deck_obj["resched"] = False
-            deck_obj["previewDelay"] = 0
-            mw.col.decks.save(deck_obj)
-
-            cards_moved = 0
-            for cid in all_cards:
-                try:
-                    card = mw.col.get_card(cid)
-                    if card.odid != 0:
-                        continue
-                    if card.queue == -1:
-                        continue
-                    card.odid = card.did
-                    card.odue = card.due
-                    card.did = cram_did
-                    card.due = -1
-                    card.queue = 1
-                    mw.col.update_card(card)
-                    cards_moved += 1
-                except Exception:
-                    pass
-
-            if cards_moved == 0:
-                mw.col.decks.remove([cram_did])
+            if cram_did is None:
+                self.setup_body()
                 showInfo(
                     f"Could not move any cards to cram deck.\n\n"
-                    f"Found {len(all_cards)} cards but none could be moved.\n\n"
+                    f"Found {result.total} cards but none could be moved "
+                    f"({result.skipped} skipped, {result.failed} failed).\n\n"
                     f"Cards may already be in another filtered deck."
                 )
                 return
 
-            addon = mw.ankicram_addon
-            addon.original_deck_id = deck_id
+            addon.original_deck_ids = selected_ids
             addon.session_start_time = time.time()
             addon.session_cards_reviewed = 0
             addon.session_cards_failed = 0
             addon.session_reloops = 0
-            addon.infinite_loop_enabled = self.infinite_loop_check.isChecked() if self.infinite_loop_check else True
-            addon.persistent_deck_mode = self.persistent_deck_check.isChecked() if self.persistent_deck_check else False
+            addon.session_cards_moved = result.moved
+            addon.infinite_loop_enabled = infinite_loop
+            addon.persistent_deck_mode = persistent_deck
+            addon.tag_filter_text = tag_text
             addon.current_cram_did = cram_did
-            addon.current_cram_name = cram_name
-            addon.base_search = f'deck:"{deck_name}"'
+            addon.cram_deck_ids.add(cram_did)
+            addon.current_cram_name = mw.col.decks.name(cram_did)
+            addon.base_search = " OR ".join(f'deck:"{name}"' for name in deck_names)
+            if len(deck_names) > 1:
+                addon.base_search = f"({addon.base_search})"
             addon.failed_cards = set()
+            addon.start_requeue()
+            addon.save_session()
 
             mw.col.decks.select(cram_did)
-            mw.reset()
+            apply_op_changes(result.changes, self)
             addon.show_corner_widget()
             self.accept()
-            tooltip(f"🚀 Cram started ({cards_moved} cards)", period=2500)
-
-        except Exception as e:
-            import traceback
-            showInfo(f"Start Error:\n{str(e)}\n\nDetails:\n{traceback.format_exc()}")
+            if result.skipped or result.failed:
+                tooltip(f"🚀 Cram started ({result.moved} cards, {result.skipped + result.failed} skipped)", period=2500)
+            else:
+                tooltip(f"🚀 Cram started ({result.moved} cards)", period=2500)
+
+        self.run_task(
+            "Building cram deck...",
+            lambda task: build_cram_deck(mw.col, cram_name, deck_ids, tag_filter, task, addon.journal),
+            on_success,
+            "Start Error",
+            "start_cramming"
+        )
 
+    @profiler.timed("stop_cramming")
     def stop_cramming(self):
-        try:
-            active = self.get_active_cram_deck()
-            if not active:
-                tooltip("⚠️ No active session", period=1500)
-                return
-
-            addon = mw.ankicram_addon
-            cram_deck_id = active['id']
+        active = self.get_active_cram_deck()
+        if not active:
+            tooltip("⚠️ No active session", period=1500)
+            return
 
+        addon = mw.ankicram_addon
+        cram_deck_id = active['id']
+        keep_deck = addon.persistent_deck_mode
+        parked = list(addon.failed_cards)
+
+        def op(task):
+            if keep_deck:
+                task.checkpoint()
+                return keep_cram_deck(mw.col, cram_deck_id, parked)
+            return end_cram_deck(mw.col, cram_deck_id, task, addon.journal)
+
+        def on_success(ret):
+            status, changes = ret
+            addon.deck_index.invalidate()
+            self.decks_dirty = True
+            if status in ("removed", "kept") and addon.journal is not None:
+                addon.journal.delete()
+            if status == "removed":
+                addon.cram_deck_ids.discard(cram_deck_id)
             mw.col.decks.select(1)
 
-            if hasattr(mw, 'reviewer') and mw.reviewer:
-                try:
-                    mw.reviewer.cleanup()
-                except Exception:
-                    pass
-
-            cleanup_success = False
-            if not addon.persistent_deck_mode:
-                try:
-                    mw.col.sched.empty_filtered_deck(cram_deck_id)
-                    mw.col.decks.remove([cram_deck_id])
-                    cleanup_success = True
-                except Exception:
-                    try:
-                        card_ids = mw.col.find_cards(f'deck:"{active["name"]}"')
-                        for cid in card_ids:
-                            card = mw.col.get_card(cid)
-                            card.did = card.odid if card.odid else 1
-                            card.odid = 0
-                            mw.col.update_card(card)
-                        mw.col.decks.remove([cram_deck_id])
-                        cleanup_success = True
-                    except Exception:
-                        try:
-                            mw.col.sched.empty_filtered_deck(cram_deck_id)
-                            tooltip("⚠️ Deck emptied but not deleted. Remove manually if needed.", period=3000)
-                        except Exception:
-                            tooltip("⚠️ Please manually delete the cram deck", period=3000)
-
-            addon.current_cram_did = None
-            addon.current_cram_name = None
-            addon.session_start_time = None
-            addon.failed_cards = set()
-            addon.session_cards_reviewed = 0
-            addon.session_cards_failed = 0
-
+            addon.record_history()
+            addon.clear_session()
+            addon.save_session()
             addon.hide_corner_widget()
-            mw.reset()
+            apply_op_changes(changes, self)
+            if mw.state in ("review", "overview"):
+                mw.moveToState("deckBrowser")
             self.accept()
 
-            if cleanup_success or addon.persistent_deck_mode:
+            if status in ("removed", "kept"):
                 tooltip("✅ Session ended", period=2000)
+            elif status == "emptied":
+                tooltip("⚠️ Deck emptied but not deleted. Remove manually if needed.", period=3000)
+            else:
+                tooltip("⚠️ Please manually delete the cram deck", period=3000)
 
-        except Exception as e:
-            addon = mw.ankicram_addon
-            addon.current_cram_did = None
-            addon.current_cram_name = None
-            addon.failed_cards = set()
-            addon.session_cards_reviewed = 0
-            addon.session_cards_failed = 0
-            addon.session_reloops = 0
-            addon.session_start_time = time.time()
-            addon.hide_corner_widget()
-
-            showInfo(f"Session ended with errors: {str(e)}\n\nYou may need to manually delete the AnkiCram deck.")
-            self.accept()
+        self.run_task("Ending session...", op, on_success, "Session ended with errors", "stop_cramming")
@@ -0,0 +1,305 @@
+import re
+from anki.utils import ids2str
+
+CRAM_PREFIX = "AnkiCram - "
+CHECKPOINT_INTERVAL = 250
+NAMED_DECKS_IN_TITLE = 3
+ROLLBACK_CONFIG_KEY = "ankicramRollback"
+
+
+class CramCancelled(Exception):
+    pass
+
+
+class MoveResult:
+    def __init__(self, moved=0, skipped=0, failed=0, changes=None):
+        self.moved = moved
+        self.skipped = skipped
+        self.failed = failed
+        self.changes = changes
+
+    @property
+    def total(self):
+        return self.moved + self.skipped + self.failed
+
+
+def cram_deck_name(deck_names):
+    if len(deck_names) == 1:
+        return f"{CRAM_PREFIX}{deck_names[0]}"
+    leaves = [name.rpartition("::")[2] for name in deck_names]
+    title = " + ".join(leaves[:NAMED_DECKS_IN_TITLE])
+    if len(leaves) > NAMED_DECKS_IN_TITLE:
+        title += f" + {len(leaves) - NAMED_DECKS_IN_TITLE} more"
+    return f"{CRAM_PREFIX}{title}"
+
+
+class TagFilter:
+    def __init__(self, text):
+        include, exclude = [], []
+        for term in re.split(r"[,\s]+", text or ""):
+            negate = term[:1] in ("-", "!")
+            term = term.lstrip("-!")
+            if not term:
+                continue
+            (exclude if negate else include).append(self._compile_term(term))
+        self._include = self._join(include)
+        self._exclude = self._join(exclude)
+
+    def _compile_term(self, term):
+        return r"\S*".join(re.escape(part) for part in term.split("*"))
+
+    def _join(self, patterns):
+        if not patterns:
+            return None
+        return re.compile(r"(?:^|\s)(?:" + "|".join(patterns) + r")(?:::\S*)?(?=\s|$)", re.IGNORECASE)
+
+    def __bool__(self):
+        return bool(self._include or self._exclude)
+
+    def matches(self, tags):
+        if self._include and not self._include.search(tags):
+            return False
+        if self._exclude and self._exclude.search(tags):
+            return False
+        return True
+
+
+def collect_card_ids(col, deck_ids, tag_filter=None):
+    if not deck_ids:
+        return []
+    if not tag_filter:
+        return col.db.list(f"SELECT id FROM cards WHERE did IN {ids2str(deck_ids)}")
+    rows = col.db.all(
+        f"SELECT c.id, n.tags FROM cards c JOIN notes n ON n.id = c.nid WHERE c.did IN {ids2str(deck_ids)}"
+    )
+    return [cid for cid, tags in rows if tag_filter.matches(tags)]
+
+
+def eligible_card_ids(col, card_ids):
+    if not card_ids:
+        return []
+    return col.db.list(
+        f"SELECT id FROM cards WHERE id IN {ids2str(card_ids)} AND odid = 0 AND queue != -1"
+    )
+
+
+def write_cards(col, cards):
+    if hasattr(col, 'update_cards'):
+        return col.update_cards(cards)
+    for card in cards:
+        col.update_card(card)
+    return None
+
+
+def load_movable_cards(col, card_ids, task=None):
+    card_ids = list(dict.fromkeys(card_ids))
+    eligible = eligible_card_ids(col, card_ids)
+    result = MoveResult(skipped=len(card_ids) - len(eligible))
+
+    cards = []
+    for i, cid in enumerate(eligible):
+        if task and i % CHECKPOINT_INTERVAL == 0:
+            task.checkpoint(i, len(eligible))
+        try:
+            cards.append(col.get_card(cid))
+        except Exception:
+            result.failed += 1
+    if task:
+        task.checkpoint(len(eligible), len(eligible))
+    return cards, result
+
+
+def move_loaded_cards(col, cards, target_did, result, journal=None):
+    if not cards:
+        return result
+    if journal is not None:
+        journal.record(cards)
+        journal.save()
+    for card in cards:
+        card.odid = card.did
+        card.odue = card.due
+        card.did = target_did
+        card.due = -1
+        card.queue = 1
+
+    try:
+        result.changes = write_cards(col, cards)
+        result.moved = len(cards)
+    except Exception:
+        result.failed += len(cards)
+    return result
+
+
+def move_cards_to_deck(col, card_ids, target_did, task=None, journal=None):
+    cards, result = load_movable_cards(col, card_ids, task)
+    return move_loaded_cards(col, cards, target_did, result, journal)
+
+
+def remove_cram_deck(col, cram_did):
+    col.sched.empty_filtered_deck(cram_did)
+    col.decks.remove([cram_did])
+
+
+def create_cram_deck(col, cram_name):
+    cram_did = col.decks.new_filtered(cram_name)
+    deck_obj = col.decks.get(cram_did)
+    deck_obj["terms"] = [["deck:_*_nonexistent_*_", 9999, 5]]
+    deck_obj["resched"] = False
+    deck_obj["previewDelay"] = 0
+    col.decks.save(deck_obj)
+    return cram_did
+
+
+def _rollback(col, undo_entry):
+    col.merge_undo_entries(undo_entry)
+    col.undo()
+    col.remove_config(ROLLBACK_CONFIG_KEY)
+
+
+def _holds_other_decks(col, cram_did, deck_ids):
+    home_dids = col.db.list("SELECT DISTINCT odid FROM cards WHERE did = ?", cram_did)
+    return not set(home_dids) <= set(deck_ids)
+
+
+def free_cram_deck_name(col, cram_name, deck_ids):
+    name = cram_name
+    number = 1
+    while True:
+        existing_id = col.decks.id_for_name(name)
+        if not existing_id or not _holds_other_decks(col, existing_id, deck_ids):
+            return name, existing_id
+        number += 1
+        name = f"{cram_name} ({number})"
+
+
+def build_cram_deck(col, cram_name, deck_ids, tag_filter=None, task=None, journal=None):
+    undo_entry = col.add_custom_undo_entry(f"Start {cram_name}")
+    try:
+        cram_name, existing_id = free_cram_deck_name(col, cram_name, deck_ids)
+        if existing_id:
+            try:
+                remove_cram_deck(col, existing_id)
+            except Exception:
+                pass
+
+        card_ids = collect_card_ids(col, deck_ids, tag_filter)
+        cards, result = load_movable_cards(col, card_ids, task)
+        cram_did = None
+        if cards:
+            cram_did = create_cram_deck(col, cram_name)
+            if journal is not None:
+                journal.begin(cram_did)
+            move_loaded_cards(col, cards, cram_did, result, journal)
+            if result.moved == 0:
+                col.decks.remove([cram_did])
+                cram_did = None
+    except Exception:
+        _rollback(col, undo_entry)
+        raise
+    result.changes = col.merge_undo_entries(undo_entry)
+    return cram_did, result
+
+
+def rebuild_cram_deck(col, cram_did, deck_ids, tag_filter=None, task=None, journal=None):
+    undo_entry = col.add_custom_undo_entry("Rebuild AnkiCram")
+    try:
+        returned = collect_card_ids(col, deck_ids, tag_filter)
+        result = move_cards_to_deck(col, returned, cram_did, task, journal)
+    except Exception:
+        _rollback(col, undo_entry)
+        raise
+    result.changes = col.merge_undo_entries(undo_entry)
+    return result
+
+
+def park_cards(col, card_ids, cram_did, until):
+    cards = []
+    for cid in col.db.list(f"SELECT id FROM cards WHERE id IN {ids2str(card_ids)} AND did = ?", cram_did):
+        card = col.get_card(cid)
+        card.queue = 1
+        card.due = until
+        cards.append(card)
+    if cards:
+        write_cards(col, cards)
+    return len(cards)
+
+
+def release_cards(col, card_ids, cram_did, journal=None):
+    in_deck = col.db.list(f"SELECT id FROM cards WHERE id IN {ids2str(card_ids)} AND did = ?", cram_did)
+    cards = []
+    for cid in in_deck:
+        card = col.get_card(cid)
+        card.queue = 1
+        card.due = -1
+        cards.append(card)
+    if cards:
+        write_cards(col, cards)
+
+    in_deck = set(in_deck)
+    returned = [cid for cid in card_ids if cid not in in_deck]
+    result = move_cards_to_deck(col, returned, cram_did, journal=journal)
+    return len(cards) + result.moved
+
+
+def restore_journaled_cards(col, journal, task=None):
+    in_deck = set(col.db.list("SELECT id FROM cards WHERE did = ?", journal.cram_did))
+    home_dids = set(col.db.list("SELECT id FROM decks"))
+    entries = [entry for entry in journal.entries() if entry[0] in in_deck and entry[1] in home_dids]
+
+    cards = []
+    for i, (cid, did, due, queue) in enumerate(entries):
+        if task and i % CHECKPOINT_INTERVAL == 0:
+            task.checkpoint(i, len(entries))
+        try:
+            card = col.get_card(cid)
+        except Exception:
+            continue
+        card.did = did
+        card.due = due
+        card.queue = queue
+        card.odid = 0
+        card.odue = 0
+        cards.append(card)
+    if task:
+        task.checkpoint(len(entries), len(entries))
+
+    if cards:
+        write_cards(col, cards)
+    return len(cards)
+
+
+def end_cram_deck(col, cram_did, task=None, journal=None):
+    undo_entry = col.add_custom_undo_entry("End AnkiCram")
+    try:
+        if task:
+            task.checkpoint()
+        if journal is not None and journal.cram_did == cram_did:
+            restore_journaled_cards(col, journal, task)
+    except CramCancelled:
+        _rollback(col, undo_entry)
+        raise
+    except Exception:
+        pass
+
+    try:
+        remove_cram_deck(col, cram_did)
+        status = "removed"
+    except Exception:
+        try:
+            col.sched.empty_filtered_deck(cram_did)
+            status = "emptied"
+        except Exception:
+            status = "failed"
+    return status, col.merge_undo_entries(undo_entry)
+
+
+def keep_cram_deck(col, cram_did, card_ids):
+    if not card_ids:
+        return "kept", None
+    undo_entry = col.add_custom_undo_entry("End AnkiCram")
+    try:
+        release_cards(col, card_ids, cram_did)
+    except Exception:
+        _rollback(col, undo_entry)
+        raise
+    return "kept", col.merge_undo_entries(undo_entry)
@@ -0,0 +1,98 @@
+import csv
+import struct
+import time
+from .session import write_atomic
+
+_RECORD = struct.Struct("<qqIB")
+_HEADER = struct.Struct("<4sq")
+_MAGIC = b"ACA1"
+
+
+class AnswerLog:
+    def __init__(self, capacity=16384):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity * _RECORD.size)
+        self.clear()
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, card_id, ease, timestamp_ms=None, taken_ms=0):
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        slot = (self._start + self._count) % self.capacity
+        _RECORD.pack_into(self._buffer, slot * _RECORD.size, card_id, timestamp_ms, min(max(taken_ms, 0), 0xFFFFFFFF), ease)
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+        self.total += 1
+
+    def __iter__(self):
+        for i in range(self._count):
+            slot = (self._start + i) % self.capacity
+            card_id, timestamp_ms, taken_ms, ease = _RECORD.unpack_from(self._buffer, slot * _RECORD.size)
+            yield card_id, ease, timestamp_ms, taken_ms
+
+    def since(self, timestamp_ms):
+        return [record for record in self if record[2] >= timestamp_ms]
+
+    def ease_counts(self):
+        counts = [0, 0, 0, 0, 0]
+        for _, ease, _, _ in self:
+            if 0 <= ease < len(counts):
+                counts[ease] += 1
+        return counts
+
+    def failures_by_card(self):
+        failures = {}
+        for card_id, ease, _, _ in self:
+            if ease == 1:
+                failures[card_id] = failures.get(card_id, 0) + 1
+        return failures
+
+    def average_time_taken(self):
+        if not self._count:
+            return 0
+        return sum(record[3] for record in self) / self._count
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("card_id", "ease", "timestamp_ms", "time_taken_ms"))
+            writer.writerows(self)
+
+    def _ordered_bytes(self):
+        start = self._start * _RECORD.size
+        end = start + self._count * _RECORD.size
+        if end <= len(self._buffer):
+            return bytes(self._buffer[start:end])
+        return bytes(self._buffer[start:]) + bytes(self._buffer[:end - len(self._buffer)])
+
+    def save(self, path):
+        write_atomic(path, _HEADER.pack(_MAGIC, self.total) + self._ordered_bytes())
+
+    def load(self, path):
+        self.clear()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < _HEADER.size or (len(data) - _HEADER.size) % _RECORD.size:
+            return False
+        magic, total = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            return False
+
+        count = min((len(data) - _HEADER.size) // _RECORD.size, self.capacity)
+        offset = len(data) - count * _RECORD.size
+        self._buffer[:count * _RECORD.size] = data[offset:]
+        self._count = count
+        self.total = max(total, count)
+        return True
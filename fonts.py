@@ -0,0 +1,56 @@
+import os
+from aqt import mw
+from aqt.qt import *
+
+FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
+FONT_FILES = ("Inter-Variable.ttf", "Inter-Bold.ttf", "EBGaramond-Italic.ttf")
+
+_families = None
+_loading = False
+
+
+def _read_font_files():
+    fonts = []
+    for name in FONT_FILES:
+        try:
+            with open(os.path.join(FONTS_DIR, name), "rb") as f:
+                fonts.append((name, f.read()))
+        except OSError:
+            continue
+    return fonts
+
+
+def _register_fonts(fonts):
+    global _families
+    if _families is not None:
+        return
+    families = {}
+    for name, data in fonts:
+        font_id = QFontDatabase.addApplicationFontFromData(QByteArray(data))
+        if font_id != -1:
+            families[name] = tuple(QFontDatabase.applicationFontFamilies(font_id))
+    _families = families
+
+
+def load_fonts_in_background():
+    global _loading
+    if _families is not None or _loading:
+        return
+    _loading = True
+
+    def on_done(future):
+        global _loading
+        _loading = False
+        try:
+            fonts = future.result()
+        except Exception:
+            return
+        _register_fonts(fonts)
+
+    mw.taskman.run_in_background(_read_font_files, on_done)
+
+
+def ensure_fonts():
+    if _families is None:
+        _register_fonts(_read_font_files())
+    return _families
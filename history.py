@@ -0,0 +1,72 @@
+import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    deck_id INTEGER NOT NULL,
+    deck_name TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    reviews INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    reloops INTEGER NOT NULL,
+    cards_moved INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_date ON sessions (profile, started_at, id);
+CREATE INDEX IF NOT EXISTS sessions_by_deck ON sessions (profile, deck_id, started_at, id);
+"""
+
+_COLUMNS = (
+    "id", "deck_id", "deck_name", "started_at", "ended_at",
+    "duration", "reviews", "failures", "reloops", "cards_moved",
+)
+
+
+class SessionHistory:
+    def __init__(self, path):
+        self._path = path
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self._path)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def record(self, profile, deck_id, deck_name, started_at, ended_at, reviews, failures, reloops, cards_moved):
+        db = self._conn()
+        with db:
+            cursor = db.execute(
+                "INSERT INTO sessions (profile, deck_id, deck_name, started_at, ended_at, duration, "
+                "reviews, failures, reloops, cards_moved) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (profile, deck_id, deck_name, int(started_at), int(ended_at), int(ended_at - started_at),
+                 reviews, failures, reloops, cards_moved)
+            )
+        return cursor.lastrowid
+
+    def page(self, profile, limit=20, before=None, deck_id=None):
+        where = ["profile = ?"]
+        args = [profile]
+        if deck_id is not None:
+            where.append("deck_id = ?")
+            args.append(deck_id)
+        if before is not None:
+            where.append("(started_at, id) < (?, ?)")
+            args.extend(before)
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM sessions WHERE {' AND '.join(where)} "
+            f"ORDER BY started_at DESC, id DESC LIMIT ?",
+            args + [limit]
+        ).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    @staticmethod
+    def cursor(row):
+        return row["started_at"], row["id"]
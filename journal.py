@@ -0,0 +1,86 @@
+import os
+import struct
+from array import array
+from .session import write_atomic
+
+_HEADER = struct.Struct("<4sqq")
+_MAGIC = b"ACJ1"
+
+
+class CardJournal:
+    def __init__(self, path):
+        self._path = path
+        self.clear_entries()
+
+    def clear_entries(self):
+        self.cram_did = 0
+        self._cids = array("q")
+        self._dids = array("q")
+        self._dues = array("q")
+        self._queues = array("b")
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._cids)
+
+    def exists(self):
+        return os.path.exists(self._path)
+
+    def begin(self, cram_did):
+        self.clear_entries()
+        self.cram_did = cram_did
+
+    def record(self, cards):
+        for card in cards:
+            pos = self._positions.get(card.id)
+            if pos is None:
+                self._positions[card.id] = len(self._cids)
+                self._cids.append(card.id)
+                self._dids.append(card.did)
+                self._dues.append(card.due)
+                self._queues.append(card.queue)
+            else:
+                self._dids[pos] = card.did
+                self._dues[pos] = card.due
+                self._queues[pos] = card.queue
+
+    def entries(self):
+        return zip(self._cids, self._dids, self._dues, self._queues)
+
+    def save(self):
+        header = _HEADER.pack(_MAGIC, self.cram_did, len(self._cids))
+        write_atomic(self._path, b"".join((
+            header,
+            self._cids.tobytes(),
+            self._dids.tobytes(),
+            self._dues.tobytes(),
+            self._queues.tobytes(),
+        )))
+
+    def load(self):
+        self.clear_entries()
+        try:
+            with open(self._path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < _HEADER.size:
+            return False
+        magic, cram_did, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) != _HEADER.size + count * 25:
+            return False
+
+        offset = _HEADER.size
+        for arr, width in ((self._cids, 8), (self._dids, 8), (self._dues, 8), (self._queues, 1)):
+            arr.frombytes(data[offset:offset + count * width])
+            offset += count * width
+        self.cram_did = cram_did
+        self._positions = {cid: pos for pos, cid in enumerate(self._cids)}
+        return True
+
+    def delete(self):
+        self.clear_entries()
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
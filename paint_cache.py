@@ -0,0 +1,76 @@
+import functools
+import math
+from aqt.qt import *
+
+PATH_CACHE_SIZE = 128
+PEN_CACHE_SIZE = 256
+GRADIENT_CACHE_SIZE = 32
+PIXMAP_CACHE_MAX_AREA = 80000
+
+
+@functools.lru_cache(maxsize=PATH_CACHE_SIZE)
+def rounded_path(width, height, radius):
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(0.5, 0.5, width - 1, height - 1), radius, radius)
+    return path
+
+
+@functools.lru_cache(maxsize=PEN_CACHE_SIZE)
+def pen(rgba, width):
+    return QPen(QColor.fromRgba(rgba), width)
+
+
+@functools.lru_cache(maxsize=PEN_CACHE_SIZE)
+def solid_brush(rgba):
+    return QBrush(QColor.fromRgba(rgba))
+
+
+@functools.lru_cache(maxsize=GRADIENT_CACHE_SIZE)
+def linear_gradient(width, height, stops):
+    grad = QLinearGradient(0, 0, width, height)
+    for pos, rgba in stops:
+        grad.setColorAt(pos, QColor.fromRgba(rgba))
+    return QBrush(grad)
+
+
+def gradient_stops(stops, parse):
+    return tuple((pos, parse(color).rgba()) for pos, color in stops)
+
+
+def _fill_brush(fill, width, height):
+    if isinstance(fill, tuple):
+        return linear_gradient(width, height, fill)
+    return solid_brush(fill)
+
+
+def draw_rounded(painter, width, height, radius, fill, border=0, border_width=0, clip=False):
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    path = rounded_path(width, height, radius)
+    if clip:
+        painter.setClipPath(path)
+    painter.fillPath(path, _fill_brush(fill, width, height))
+    if border_width > 0 and border >> 24:
+        painter.strokePath(path, pen(border, border_width))
+
+
+def rounded_background(width, height, dpr, radius, fill, border=0, border_width=0, clip=False):
+    key = f"ankicram:{width}x{height}@{dpr}:{radius}:{fill}:{border}:{border_width}:{int(clip)}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = QPixmap(math.ceil(width * dpr), math.ceil(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        draw_rounded(painter, width, height, radius, fill, border, border_width, clip)
+        painter.end()
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def paint_rounded(painter, width, height, dpr, radius, fill, border=0, border_width=0, clip=False, cache=True):
+    if cache and width * height <= PIXMAP_CACHE_MAX_AREA:
+        painter.drawPixmap(0, 0, rounded_background(width, height, dpr, radius, fill, border, border_width, clip))
+    else:
+        painter.save()
+        draw_rounded(painter, width, height, radius, fill, border, border_width, clip)
+        painter.restore()
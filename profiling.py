@@ -0,0 +1,140 @@
+import functools
+import io
+import math
+import threading
+import time
+from collections import deque
+
+DEFAULT_SAMPLES = 500
+REPORT_PERCENTILES = (50, 90, 99)
+REPORT_STATS_LINES = 25
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class Profiler:
+    def __init__(self, samples=DEFAULT_SAMPLES):
+        self.enabled = False
+        self.capture = False
+        self.samples = samples
+        self._timings = {}
+        self._counts = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._capturing = False
+
+    def configure(self, config):
+        self.enabled = bool(config.get("profiling_enabled", False))
+        self.capture = self.enabled and bool(config.get("profiling_cprofile", False))
+        samples = max(10, int(config.get("profiling_samples", DEFAULT_SAMPLES)))
+        if samples != self.samples:
+            self.samples = samples
+            with self._lock:
+                self._timings = {name: deque(times, maxlen=samples) for name, times in self._timings.items()}
+
+    def reset(self):
+        with self._lock:
+            self._timings = {}
+            self._counts = {}
+            self._stats = {}
+
+    def call(self, name, fn, *args, **kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        profile = None
+        if self.capture:
+            with self._lock:
+                if not self._capturing:
+                    self._capturing = True
+                    import cProfile
+                    profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            if profile is None:
+                return fn(*args, **kwargs)
+            try:
+                return profile.runcall(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._capturing = False
+        finally:
+            self._record(name, time.perf_counter() - start, profile)
+
+    def wrap(self, name, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.call(name, fn, *args, **kwargs)
+        return wrapper
+
+    def timed(self, name):
+        return lambda fn: self.wrap(name, fn)
+
+    def _record(self, name, elapsed, profile):
+        with self._lock:
+            times = self._timings.get(name)
+            if times is None:
+                times = self._timings[name] = deque(maxlen=self.samples)
+            times.append(elapsed)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if profile is not None:
+                import pstats
+                stats = self._stats.get(name)
+                if stats is None:
+                    self._stats[name] = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: (self._counts[name], sorted(times)) for name, times in self._timings.items()}
+        rows = []
+        for name in sorted(snapshot):
+            count, times = snapshot[name]
+            row = {
+                "name": name,
+                "calls": count,
+                "window": len(times),
+                "mean_ms": sum(times) / len(times) * 1000,
+                "max_ms": times[-1] * 1000,
+            }
+            for pct in REPORT_PERCENTILES:
+                row[f"p{pct}_ms"] = percentile(times, pct) * 1000
+            rows.append(row)
+        return rows
+
+    def report(self):
+        out = io.StringIO()
+        out.write(f"AnkiCram performance report ({time.strftime('%Y-%m-%d %H:%M:%S')})\n")
+        out.write(f"cProfile capture: {'on' if self.capture else 'off'}, window: last {self.samples} calls\n\n")
+
+        rows = self.summary()
+        if not rows:
+            out.write("No timings recorded yet.\n")
+        else:
+            pct_headers = "".join(f"{f'p{pct}':>10}" for pct in REPORT_PERCENTILES)
+            out.write(f"{'entry point':<32}{'calls':>8}{'mean':>10}{pct_headers}{'max':>10}   (ms)\n")
+            for row in rows:
+                pcts = "".join(f"{row[f'p{pct}_ms']:>10.2f}" for pct in REPORT_PERCENTILES)
+                out.write(f"{row['name']:<32}{row['calls']:>8}{row['mean_ms']:>10.2f}{pcts}{row['max_ms']:>10.2f}\n")
+
+        with self._lock:
+            for name in sorted(self._stats):
+                out.write(f"\n=== cProfile: {name} (cumulative) ===\n")
+                stat = self._stats[name]
+                stat.stream = out
+                stat.sort_stats("cumulative").print_stats(REPORT_STATS_LINES)
+        return out.getvalue()
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        return path
+
+
+profiler = Profiler()
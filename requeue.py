@@ -0,0 +1,47 @@
+import heapq
+
+
+class RequeueScheduler:
+    def __init__(self, offset=3):
+        self.offset = offset
+        self.clear()
+
+    def clear(self):
+        self._heap = []
+        self._parked = {}
+        self._seq = 0
+        self._answered = 0
+
+    def __len__(self):
+        return len(self._parked)
+
+    def __contains__(self, card_id):
+        return card_id in self._parked
+
+    def on_answer(self, card_id, failed):
+        self._answered += 1
+        park = []
+        if failed:
+            release_at = self._answered + self.offset
+            self._parked[card_id] = release_at
+            self._seq += 1
+            heapq.heappush(self._heap, (release_at, self._seq, card_id))
+            park.append(card_id)
+        else:
+            self._parked.pop(card_id, None)
+        return park, self._pop_due()
+
+    def _pop_due(self):
+        released = []
+        while self._heap and self._heap[0][0] <= self._answered:
+            release_at, _, card_id = heapq.heappop(self._heap)
+            if self._parked.get(card_id) == release_at:
+                del self._parked[card_id]
+                released.append(card_id)
+        return released
+
+    def release_all(self):
+        released = list(self._parked)
+        self._heap = []
+        self._parked = {}
+        return released
@@ -0,0 +1,63 @@
+import re
+
+_TOKEN_SPLIT = re.compile(r"::|[\s\-_/.]+")
+
+
+class DeckSearchIndex:
+    def __init__(self, decks):
+        self._entries = []
+        for order, (name, deck_id) in enumerate(decks):
+            lower = name.lower()
+            leaf = lower.rpartition("::")[2]
+            tokens = tuple(t for t in _TOKEN_SPLIT.split(lower) if t)
+            self._entries.append((order, name, deck_id, lower, leaf, tokens))
+        self._last_query = ""
+        self._last_matches = self._entries
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            self._last_query = ""
+            self._last_matches = self._entries
+            return [(name, deck_id) for _, name, deck_id, _, _, _ in self._entries]
+
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = self._entries
+
+        fuzzy = re.compile(".*?".join(re.escape(ch) for ch in query))
+        scored = []
+        matches = []
+        for entry in candidates:
+            score = self._score(entry, query, fuzzy)
+            if score is None:
+                continue
+            matches.append(entry)
+            scored.append((-score, len(entry[3]), entry[0], entry[1], entry[2]))
+
+        self._last_query = query
+        self._last_matches = matches
+        scored.sort()
+        return [(name, deck_id) for _, _, _, name, deck_id in scored]
+
+    def _score(self, entry, query, fuzzy):
+        _, _, _, lower, leaf, tokens = entry
+        if leaf == query:
+            return 1000
+        if leaf.startswith(query):
+            return 800
+        if any(token.startswith(query) for token in tokens):
+            return 600
+        if query in leaf:
+            return 500
+        if query in lower:
+            return 300
+
+        match = fuzzy.search(leaf)
+        if match:
+            return 200 - min(match.end() - match.start() - len(query), 99)
+        match = fuzzy.search(lower)
+        if match:
+            return 100 - min(match.end() - match.start() - len(query), 99)
+        return None
@@ -0,0 +1,73 @@
+import json
+import os
+
+USER_FILES_DIR = os.path.join(os.path.dirname(__file__), "user_files")
+
+SESSION_FIELDS = (
+    "current_cram_did",
+    "current_cram_name",
+    "original_deck_ids",
+    "session_start_time",
+    "session_cards_reviewed",
+    "session_cards_failed",
+    "session_reloops",
+    "session_cards_moved",
+    "infinite_loop_enabled",
+    "persistent_deck_mode",
+    "base_search",
+    "tag_filter_text",
+)
+
+
+def user_file(name):
+    os.makedirs(USER_FILES_DIR, exist_ok=True)
+    return os.path.join(USER_FILES_DIR, name)
+
+
+def write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SessionRegistry:
+    def __init__(self, path):
+        self._path = path
+        self._sessions = None
+
+    def _load(self):
+        if self._sessions is not None:
+            return
+        try:
+            with open(self._path, "r") as f:
+                self._sessions = json.load(f)
+        except (OSError, ValueError):
+            self._sessions = {}
+
+    def _save(self):
+        write_atomic(self._path, json.dumps(self._sessions, indent=2))
+
+    def get(self, profile):
+        self._load()
+        return self._sessions.get(profile)
+
+    def put(self, profile, session):
+        self._load()
+        self._sessions[profile] = session
+        self._save()
+
+    def remove(self, profile):
+        self._load()
+        if self._sessions.pop(profile, None) is not None:
+            self._save()
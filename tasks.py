@@ -0,0 +1,44 @@
+from aqt import mw
+from aqt.operations import QueryOp, on_op_finished
+from .engine import CramCancelled
+
+
+def apply_op_changes(changes, initiator=None):
+    if changes is None:
+        return
+    on_op_finished(mw, changes, initiator)
+
+
+class CramTask:
+    def __init__(self, op, on_success, on_failure, on_progress=None, parent=None):
+        self._op = op
+        self._parent = parent or mw
+        self._on_success = on_success
+        self._on_failure = on_failure
+        self._on_progress = on_progress
+        self._cancelled = False
+        self._last_percent = -1
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+
+    def checkpoint(self, done=0, total=0):
+        if self._cancelled:
+            raise CramCancelled()
+        if not total or not self._on_progress:
+            return
+        percent = int(done * 100 / total)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            mw.taskman.run_on_main(lambda: self._on_progress(percent))
+
+    def run(self):
+        QueryOp(
+            parent=self._parent,
+            op=lambda col: self._op(self),
+            success=self._on_success,
+        ).failure(self._on_failure).run_in_background()
@@ -1,8 +1,8 @@
+import functools
 import re
+from types import MappingProxyType
 from aqt.qt import QColor
 
-VERSION = "v1.0.2"
-
 THEME = {
     "bg": "#030712",
     "glass": "rgba(255, 255, 255, 0.03)",
@@ -82,14 +82,29 @@ STYLESHEET = f"""
 """
 
 
+_RGBA_RE = re.compile(r"rgba\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*([\d.]+)\s*\)")
+
+
+@functools.lru_cache(maxsize=256)
 def css_to_qcolor(css_str: str) -> QColor:
     if not css_str or css_str == "transparent":
         return QColor(0, 0, 0, 0)
     
-    rgba_match = re.match(r"rgba\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*([\d.]+)\s*\)", css_str)
+    rgba_match = _RGBA_RE.match(css_str)
     if rgba_match:
         r, g, b, a = rgba_match.groups()
         return QColor(int(r), int(g), int(b), int(float(a) * 255))
     
     return QColor(css_str)
 
+
+def _compile_palette(theme):
+    palette = {}
+    for key, value in theme.items():
+        color = css_to_qcolor(value)
+        if color.isValid():
+            palette[key] = color
+    return MappingProxyType(palette)
+
+
+PALETTE = _compile_palette(THEME)
@@ -0,0 +1 @@
+VERSION = "v1.0.2"
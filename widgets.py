@@ -1,7 +1,8 @@
-import sys
 from aqt import mw
 from aqt.qt import *
-from .theme import THEME, css_to_qcolor
+from .theme import THEME, PALETTE, css_to_qcolor
+from .animation import animation_driver, lerp_color
+from .paint_cache import gradient_stops, paint_rounded
 
 
 class ClickableLabel(QLabel):
@@ -24,15 +25,8 @@ class RoundedWidget(QWidget):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        path = QPainterPath()
-        path.addRoundedRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5), self._radius, self._radius)
-        painter.setClipPath(path)
-        painter.fillPath(path, self._bg_color)
-        if self._border_width > 0 and self._border_color.alpha() > 0:
-            pen = QPen(self._border_color, self._border_width)
-            painter.setPen(pen)
-            painter.drawPath(path)
+        paint_rounded(painter, self.width(), self.height(), self.devicePixelRatioF(), self._radius,
+                      self._bg_color.rgba(), self._border_color.rgba(), self._border_width, clip=True)
         painter.end()
 
 
@@ -42,19 +36,15 @@ class StatCard(QFrame):
         if value_color is None:
             value_color = THEME['text']
 
-        self._bg_normal = css_to_qcolor(THEME['glass'])
-        self._bg_hover_target = css_to_qcolor(THEME['glass_hover'])
-        self._border_normal = css_to_qcolor(THEME['glass_border'])
-        self._border_hover_target = css_to_qcolor(THEME['primary'])
+        self._bg_normal = PALETTE['glass']
+        self._bg_hover_target = PALETTE['glass_hover']
+        self._border_normal = PALETTE['glass_border']
+        self._border_hover_target = PALETTE['primary']
 
         self._current_bg = self._bg_normal
         self._current_border = self._border_normal
         self._radius = 10
-
-        self.ani = QVariantAnimation(self)
-        self.ani.setDuration(250)
-        self.ani.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.ani.valueChanged.connect(self._on_ani_value_changed)
+        self._hover = 0.0
 
         self.setAttribute(Qt.WidgetAttribute.WA_Hover)
         self.setStyleSheet("background-color: transparent; border: none; border-radius: 16px;")
@@ -73,170 +63,307 @@ class StatCard(QFrame):
         top_layout.addWidget(title_lbl)
         top_layout.addStretch()
 
-        value_lbl = QLabel(str(value))
-        value_lbl.setStyleSheet(f"color: {value_color}; font-size: 28px; font-weight: 800; border: none; background: transparent;")
+        self.value_lbl = QLabel(str(value))
+        self.value_lbl.setStyleSheet(f"color: {value_color}; font-size: 28px; font-weight: 800; border: none; background: transparent;")
 
         layout.addLayout(top_layout)
         layout.addSpacing(5)
-        layout.addWidget(value_lbl)
+        layout.addWidget(self.value_lbl)
         self.setLayout(layout)
 
-    def _on_ani_value_changed(self, value):
-        self._current_bg = self._lerp_color(self._bg_normal, self._bg_hover_target, value)
-        self._current_border = self._lerp_color(self._border_normal, self._border_hover_target, value)
-        self.update()
+    def set_value(self, value):
+        text = str(value)
+        if self.value_lbl.text() != text:
+            self.value_lbl.setText(text)
 
-    def _lerp_color(self, c1, c2, factor):
-        r = c1.red() + (c2.red() - c1.red()) * factor
-        g = c1.green() + (c2.green() - c1.green()) * factor
-        b = c1.blue() + (c2.blue() - c1.blue()) * factor
-        a = c1.alpha() + (c2.alpha() - c1.alpha()) * factor
-        return QColor(int(r), int(g), int(b), int(a))
+    def _on_hover_changed(self, value):
+        self._hover = value
+        self._current_bg = lerp_color(self._bg_normal, self._bg_hover_target, value)
+        self._current_border = lerp_color(self._border_normal, self._border_hover_target, value)
+        self.update()
 
     def enterEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Forward)
-            if self.ani.state() != QAbstractAnimation.State.Running:
-                self.ani.start()
-        else:
-            self._current_bg = self._bg_hover_target
-            self._current_border = self._border_hover_target
-            self.update()
+        animation_driver().animate(self, self._hover, 1.0, 250, self._on_hover_changed)
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Backward)
-            if self.ani.state() != QAbstractAnimation.State.Running:
-                self.ani.start()
-        else:
-            self._current_bg = self._bg_normal
-            self._current_border = self._border_normal
-            self.update()
+        animation_driver().animate(self, self._hover, 0.0, 250, self._on_hover_changed)
         super().leaveEvent(event)
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        rect = QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5)
-        path = QPainterPath()
-        path.addRoundedRect(rect, self._radius, self._radius)
-        
-        painter.fillPath(path, self._current_bg)
-        pen = QPen(self._current_border, 1)
-        painter.setPen(pen)
-        painter.drawPath(path)
+        paint_rounded(painter, self.width(), self.height(), self.devicePixelRatioF(), self._radius,
+                      self._current_bg.rgba(), self._current_border.rgba(), 1,
+                      cache=self._hover in (0.0, 1.0))
         painter.end()
 
 
-class DeckSelectButton(QPushButton):
-    def __init__(self, name, deck_id, parent=None):
+class DeckListModel(QAbstractListModel):
+    DeckIdRole = Qt.ItemDataRole.UserRole + 1
+    SelectedRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, decks=(), parent=None):
         super().__init__(parent)
-        self.deck_name = name
-        self.deck_id = deck_id
-        self.setCheckable(True)
-        self.setFixedHeight(60)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self._decks = list(decks)
+        self._rows = self._decks
+        self.selected_ids = set()
+        self._default_selection = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name, deck_id = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == self.DeckIdRole:
+            return deck_id
+        if role == self.SelectedRole:
+            return deck_id in self.selected_ids
+        return None
+
+    def deck_at(self, row):
+        return self._rows[row]
+
+    def selected_decks(self):
+        return [(name, deck_id) for name, deck_id in self._decks if deck_id in self.selected_ids]
+
+    def select_row(self, row, toggle=False):
+        deck_id = self._rows[row][1]
+        if toggle and self._default_selection:
+            toggle = False
+        self._default_selection = False
+        if toggle:
+            changed = {deck_id}
+            if deck_id in self.selected_ids:
+                self.selected_ids.discard(deck_id)
+            else:
+                self.selected_ids.add(deck_id)
+        else:
+            changed = self.selected_ids | {deck_id}
+            self.selected_ids = {deck_id}
+        for r, (_, did) in enumerate(self._rows):
+            if did in changed:
+                self.dataChanged.emit(self.index(r), self.index(r))
+
+    def prune_selection(self):
+        deck_ids = {did for _, did in self._decks}
+        self.selected_ids &= deck_ids
+        if not self.selected_ids and self._decks:
+            self.selected_ids = {self._decks[0][1]}
+            self._default_selection = True
+
+    def clear_filter(self):
+        if self._rows is not self._decks:
+            self.set_rows(self._decks)
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def set_decks(self, decks, rows=None):
+        decks = list(decks)
+        if rows is not None or self._rows is not self._decks:
+            self._decks = decks
+            self.set_rows(decks if rows is None else rows)
+            return
+
+        wanted = {did: name for name, did in decks}
+        rows = self._rows
+        end = len(rows)
+        while end > 0:
+            if wanted.get(rows[end - 1][1]) == rows[end - 1][0]:
+                end -= 1
+                continue
+            start = end - 1
+            while start > 0 and wanted.get(rows[start - 1][1]) != rows[start - 1][0]:
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+            del rows[start:end]
+            self.endRemoveRows()
+            end = start
+
+        pos = 0
+        while pos < len(decks):
+            if pos < len(rows) and rows[pos] == decks[pos]:
+                pos += 1
+                continue
+            end = pos
+            while end < len(decks) and (pos >= len(rows) or decks[end] != rows[pos]):
+                end += 1
+            self.beginInsertRows(QModelIndex(), pos, end - 1)
+            rows[pos:pos] = decks[pos:end]
+            self.endInsertRows()
+            pos = end
+
+        if rows != decks:
+            self.set_rows(decks)
+        self._decks = self._rows
+
+
+class DeckItemDelegate(QStyledItemDelegate):
+    def __init__(self, view):
+        super().__init__(view)
+        self._view = view
         self._radius = 8
+        self._row_height = 60
+        self._spacing = 10
 
-        self._bg_normal = css_to_qcolor(THEME['glass'])
-        self._bg_hover = css_to_qcolor(THEME['glass_hover'])
+        self._bg_normal = PALETTE['glass']
+        self._bg_hover = PALETTE['glass_hover']
         self._bg_selected = css_to_qcolor("rgba(167, 139, 250, 0.15)")
-        
-        self._border_normal = css_to_qcolor(THEME['glass_border'])
-        self._border_active = css_to_qcolor(THEME['primary'])
-
-        self._current_bg = self._bg_normal
-        self._current_border = self._border_normal
-
-        self.ani = QVariantAnimation(self)
-        self.ani.setDuration(200)
-        self.ani.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.ani.valueChanged.connect(self._on_ani_value_changed)
 
-        self.setAttribute(Qt.WidgetAttribute.WA_Hover)
-        display_name = name.split("::")[-1]
-        path = "::".join(name.split("::")[:-1])
-        self.setup_ui(display_name, path)
-
-    def setup_ui(self, display_name, path):
-        layout = QVBoxLayout()
-        layout.setContentsMargins(20, 10, 20, 10)
-        layout.setSpacing(2)
-
-        if path:
-            path_lbl = QLabel(path)
-            path_lbl.setStyleSheet(f"font-size: 11px; color: {THEME['text_muted']}; background: transparent; border: none;")
-            layout.addWidget(path_lbl)
-
-        name_lbl = QLabel(display_name)
-        name_lbl.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {THEME['text']}; background: transparent; border: none;")
-        layout.addWidget(name_lbl)
-
-        self.setLayout(layout)
-        self.update_style()
-        self.toggled.connect(self.update_style)
-
-    def _on_ani_value_changed(self, value):
-        target_bg = self._get_target_bg()
-        target_border = self._get_target_border()
-        
-        self._current_bg = self._lerp_color(self._bg_normal if self.ani.direction() == QAbstractAnimation.Direction.Backward else self._current_bg, target_bg, value)
-        self._current_border = self._lerp_color(self._border_normal if self.ani.direction() == QAbstractAnimation.Direction.Backward else self._current_border, target_border, value)
-        self.update()
-
-    def _get_target_bg(self):
-        if self.isChecked(): return self._bg_selected
-        if self.underMouse(): return self._bg_hover
-        return self._bg_normal
-
-    def _get_target_border(self):
-        if self.isChecked() or self.underMouse(): return self._border_active
-        return self._border_normal
+        self._border_normal = PALETTE['glass_border']
+        self._border_active = PALETTE['primary']
+
+        self._path_color = PALETTE['text_muted']
+        self._name_color = PALETTE['text']
+
+        self._path_font = QFont("Inter")
+        self._path_font.setPixelSize(11)
+        self._name_font = QFont("Inter")
+        self._name_font.setPixelSize(15)
+        self._name_font.setWeight(QFont.Weight.Bold)
+        self._path_metrics = QFontMetrics(self._path_font)
+        self._name_metrics = QFontMetrics(self._name_font)
+
+        self._hover_row = -1
+        self._progress = {}
+
+    def sizeHint(self, option, index):
+        return QSize(0, self._row_height + self._spacing)
+
+    def clear_hover(self):
+        animation_driver().stop_group(self)
+        self._progress = {}
+        self._hover_row = -1
+
+    def set_hover_row(self, row):
+        if row == self._hover_row:
+            return
+        old_row = self._hover_row
+        self._hover_row = row
+        if old_row >= 0:
+            self._animate(old_row, False)
+        if row >= 0:
+            self._animate(row, True)
+
+    def _animate(self, row, forward):
+        animation_driver().animate(
+            (self, row), self._progress.get(row, 0.0), 1.0 if forward else 0.0, 200,
+            lambda value, r=row: self._on_progress_changed(r, value), group=self
+        )
+
+    def _on_progress_changed(self, row, value):
+        if value:
+            self._progress[row] = value
+        else:
+            self._progress.pop(row, None)
+        self._update_row(row)
+
+    def _update_row(self, row):
+        model = self._view.model()
+        if model is not None and 0 <= row < model.rowCount():
+            self._view.viewport().update(self._view.visualRect(model.index(row, 0)))
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.translate(option.rect.topLeft())
+        width = option.rect.width() - self._spacing
+        height = option.rect.height() - self._spacing
+
+        cache = True
+        if index.data(DeckListModel.SelectedRole):
+            bg, border = self._bg_selected, self._border_active
+        else:
+            progress = self._progress.get(index.row(), 0.0)
+            if progress <= 0.0:
+                bg, border = self._bg_normal, self._border_normal
+            elif progress >= 1.0:
+                bg, border = self._bg_hover, self._border_active
+            else:
+                bg = lerp_color(self._bg_normal, self._bg_hover, progress)
+                border = lerp_color(self._border_normal, self._border_active, progress)
+                cache = False
+
+        paint_rounded(painter, width, height, painter.device().devicePixelRatioF(), self._radius,
+                      bg.rgba(), border.rgba(), 1, cache=cache)
+
+        path_text, _, display_name = index.data().rpartition("::")
+        text_rect = QRectF(20.5, 0.5, width - 41, height - 1)
+        path_metrics = self._path_metrics
+        name_metrics = self._name_metrics
+        text_height = name_metrics.height()
+        if path_text:
+            text_height += path_metrics.height() + 2
+        y = text_rect.top() + (text_rect.height() - text_height) / 2
+
+        if path_text:
+            painter.setFont(self._path_font)
+            painter.setPen(self._path_color)
+            path_rect = QRectF(text_rect.left(), y, text_rect.width(), path_metrics.height())
+            painter.drawText(path_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             path_metrics.elidedText(path_text, Qt.TextElideMode.ElideMiddle, int(text_rect.width())))
+            y += path_metrics.height() + 2
+
+        painter.setFont(self._name_font)
+        painter.setPen(self._name_color)
+        name_rect = QRectF(text_rect.left(), y, text_rect.width(), name_metrics.height())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         name_metrics.elidedText(display_name, Qt.TextElideMode.ElideRight, int(text_rect.width())))
+        painter.restore()
+
+
+class DeckListView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.viewport().setAutoFillBackground(False)
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setItemDelegate(DeckItemDelegate(self))
+        self.clicked.connect(self._on_clicked)
+
+    def setModel(self, model):
+        super().setModel(model)
+        self.itemDelegate().clear_hover()
+        model.modelReset.connect(self.itemDelegate().clear_hover)
+        model.rowsInserted.connect(self.itemDelegate().clear_hover)
+        model.rowsRemoved.connect(self.itemDelegate().clear_hover)
+
+    def _on_clicked(self, index):
+        if index.isValid():
+            toggle = QApplication.keyboardModifiers() & (
+                Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier
+            )
+            self.model().select_row(index.row(), bool(toggle))
+
+    def _update_hover(self, pos):
+        self.itemDelegate().set_hover_row(self.indexAt(pos).row())
 
-    def _lerp_color(self, c1, c2, factor):
-        r = c1.red() + (c2.red() - c1.red()) * factor
-        g = c1.green() + (c2.green() - c1.green()) * factor
-        b = c1.blue() + (c2.blue() - c1.blue()) * factor
-        a = c1.alpha() + (c2.alpha() - c1.alpha()) * factor
-        return QColor(int(r), int(g), int(b), int(a))
+    def mouseMoveEvent(self, event):
+        self._update_hover(event.position().toPoint())
+        super().mouseMoveEvent(event)
 
-    def enterEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Forward)
-            self.ani.start()
-        else:
-            self.update_style()
-        super().enterEvent(event)
+    def wheelEvent(self, event):
+        super().wheelEvent(event)
+        self._update_hover(event.position().toPoint())
 
     def leaveEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Backward)
-            self.ani.start()
-        else:
-            self.update_style()
+        self.itemDelegate().set_hover_row(-1)
         super().leaveEvent(event)
 
-    def update_style(self):
-        if not self.ani.state() == QAbstractAnimation.State.Running:
-            self._current_bg = self._get_target_bg()
-            self._current_border = self._get_target_border()
-        self.update()
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5)
-        path = QPainterPath()
-        path.addRoundedRect(rect, self._radius, self._radius)
-        
-        painter.fillPath(path, self._current_bg)
-        pen = QPen(self._current_border, 1)
-        painter.setPen(pen)
-        painter.drawPath(path)
-        painter.end()
-
 
 class RoundedButton(QPushButton):
     def __init__(self, text, radius, bg_color, hover_color, text_color="white", hover_text_color=None, border_color=None, border_width=0, gradient=None, parent=None):
@@ -249,83 +376,46 @@ class RoundedButton(QPushButton):
         self._hover_target_color = css_to_qcolor(hover_color)
         self._text_color = css_to_qcolor(text_color)
         self._hover_text_target = css_to_qcolor(hover_text_color) if hover_text_color else self._text_color
-        self._border_color = css_to_qcolor(border_color) if border_color else QColor(0, 0, 0, 0)
+        self._border_color = css_to_qcolor(border_color)
         self._border_width = border_width
-        self._gradient_stops = gradient
+        self._gradient = gradient_stops(gradient, css_to_qcolor) if gradient else None
         
         self._current_bg = self._bg_color
         self._current_text = self._text_color
-        
-        self.ani = QVariantAnimation(self)
-        self.ani.setDuration(200)
-        self.ani.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.ani.valueChanged.connect(self._on_ani_value_changed)
+        self._hover = 0.0
 
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setAttribute(Qt.WidgetAttribute.WA_Hover)
         self.setStyleSheet("border: none; background: transparent;")
 
-    def _on_ani_value_changed(self, value):
-        self._current_bg = self._lerp_color(self._bg_color, self._hover_target_color, value)
-        self._current_text = self._lerp_color(self._text_color, self._hover_text_target, value)
+    def _on_hover_changed(self, value):
+        self._hover = value
+        self._current_bg = lerp_color(self._bg_color, self._hover_target_color, value)
+        self._current_text = lerp_color(self._text_color, self._hover_text_target, value)
         self.update()
 
-    def _lerp_color(self, c1, c2, factor):
-        r = c1.red() + (c2.red() - c1.red()) * factor
-        g = c1.green() + (c2.green() - c1.green()) * factor
-        b = c1.blue() + (c2.blue() - c1.blue()) * factor
-        a = c1.alpha() + (c2.alpha() - c1.alpha()) * factor
-        return QColor(int(r), int(g), int(b), int(a))
-
     def enterEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Forward)
-            if self.ani.state() != QAbstractAnimation.State.Running:
-                self.ani.start()
-        else:
-            self._current_bg = self._hover_target_color
-            self._current_text = self._hover_text_target
-            self.update()
+        animation_driver().animate(self, self._hover, 1.0, 200, self._on_hover_changed)
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        if sys.platform != "win32":
-            self.ani.setDirection(QAbstractAnimation.Direction.Backward)
-            if self.ani.state() != QAbstractAnimation.State.Running:
-                self.ani.start()
-        else:
-            self._current_bg = self._bg_color
-            self._current_text = self._text_color
-            self.update()
+        animation_driver().animate(self, self._hover, 0.0, 200, self._on_hover_changed)
         super().leaveEvent(event)
 
-    def _get_bg_brush(self):
-        if self.ani.state() == QAbstractAnimation.State.Running or self.underMouse():
-            return QBrush(self._current_bg)
-        
-        if self._gradient_stops:
-            grad = QLinearGradient(0, 0, self.width(), self.height())
-            for pos, color in self._gradient_stops:
-                grad.setColorAt(pos, css_to_qcolor(color))
-            return QBrush(grad)
-            
-        return QBrush(self._bg_color)
+    def _background_fill(self, animating):
+        if animating or self.underMouse():
+            return self._current_bg.rgba()
+        if self._gradient:
+            return self._gradient
+        return self._bg_color.rgba()
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5)
-        path = QPainterPath()
-        path.addRoundedRect(rect, self._radius, self._radius)
-        
-        painter.fillPath(path, self._get_bg_brush())
-        
-        if self._border_width > 0:
-            pen = QPen(self._border_color, self._border_width)
-            painter.setPen(pen)
-            painter.drawPath(path)
-            
+        animating = 0.0 < self._hover < 1.0
+        paint_rounded(painter, self.width(), self.height(), self.devicePixelRatioF(), self._radius,
+                      self._background_fill(animating), self._border_color.rgba(), self._border_width,
+                      cache=not animating)
+
         painter.setPen(self._current_text)
         painter.setFont(self.font())
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter, self.text())
@@ -338,8 +428,8 @@ class CramCornerWidget(QPushButton):
         self.setWindowFlags(Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setFixedSize(140, 50)
-        self._bg = QColor(THEME['bg'])
-        self._border = QColor(THEME['primary'])
+        self._bg = PALETTE['bg']
+        self._border = PALETTE['primary']
         self._radius = 25
         self.setup_ui()
         self.update_position()
@@ -371,15 +461,8 @@ class CramCornerWidget(QPushButton):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        rect = QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5)
-        path = QPainterPath()
-        path.addRoundedRect(rect, self._radius, self._radius)
-        painter.setClipPath(path)
-        painter.fillPath(path, self._bg)
-        pen = QPen(self._border, 1)
-        painter.setPen(pen)
-        painter.drawPath(path)
+        paint_rounded(painter, self.width(), self.height(), self.devicePixelRatioF(), self._radius,
+                      self._bg.rgba(), self._border.rgba(), 1, clip=True)
         painter.end()
 
     def update_position(self):